@@ -1,103 +1,686 @@
+import hashlib
+import itertools
+import json
+import logging
+import multiprocessing
+import os
+import shutil
 import sqlite3
+import tempfile
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+import airportsdata
+import fnmatch
 import pandas as pd
 
-def criarTable():
-    df = pd.read_csv("data\\resumo_anual_2025.csv", sep=';', encoding='latin-1')
+from data import esquema
 
-    columns_to_drop = [
-        'AEROPORTO DE ORIGEM (UF)',
-        'AEROPORTO DE ORIGEM (REGIÃO)',
-        'AEROPORTO DE DESTINO (UF)',
-        'AEROPORTO DE DESTINO (REGIÃO)'
-    ]
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
 
-    existing_columns_to_drop = [col for col in columns_to_drop if col in df.columns]
-    if existing_columns_to_drop:
-        df.drop(columns=existing_columns_to_drop, inplace=True)
+logger = logging.getLogger(__name__)
 
-    df.dropna(inplace=True)
+# CSVs, bancos e manifesto (outro diretório: escalas do data/benchmark.py)
+DATA_DIR = os.environ.get("ANAC_DATA_DIR", "data")
+MANIFESTO_PATH = os.path.join(DATA_DIR, "voos_manifesto.json")
+# Trava de construção compartilhada por todos os processos que usam DATA_DIR
+LOCK_PATH = os.path.join(DATA_DIR, "voos_construcao.lock")
 
-    conn = sqlite3.connect("data/voos.db")
-    cursor = conn.cursor()
+# Arquivos da ANAC carregados de DATA_DIR (anuais e mensais). Quando mais
+# de um arquivo cobre o mesmo (ano, mês), vale o último em ordem de nome.
+PADROES_CSV = ("resumo_anual_*.csv", "resumo_mensal_*.csv")
+
+COLUNAS_DESCARTADAS = [
+    'AEROPORTO DE ORIGEM (UF)',
+    'AEROPORTO DE ORIGEM (REGIÃO)',
+    'AEROPORTO DE DESTINO (UF)',
+    'AEROPORTO DE DESTINO (REGIÃO)'
+]
+
+COLUNAS_CSV = {
+    'EMPRESA (SIGLA)': 'empresa_sigla',
+    'EMPRESA (NOME)': 'empresa_nome',
+    'EMPRESA (NACIONALIDADE)': 'empresa_nacionalidade',
+    'ANO': 'ano',
+    'MÊS': 'mes',
+    'AEROPORTO DE ORIGEM (SIGLA)': 'origem_sigla',
+    'AEROPORTO DE ORIGEM (NOME)': 'origem_nome',
+    'AEROPORTO DE ORIGEM (PAÍS)': 'origem_pais',
+    'AEROPORTO DE ORIGEM (CONTINENTE)': 'origem_continente',
+    'AEROPORTO DE DESTINO (SIGLA)': 'destino_sigla',
+    'AEROPORTO DE DESTINO (NOME)': 'destino_nome',
+    'AEROPORTO DE DESTINO (PAÍS)': 'destino_pais',
+    'AEROPORTO DE DESTINO (CONTINENTE)': 'destino_continente',
+    'NATUREZA': 'natureza',
+    'GRUPO DE VOO': 'grupo_voo',
+    'PASSAGEIROS PAGOS': 'passageiros_pagos',
+    'PASSAGEIROS GRÁTIS': 'passageiros_gratis',
+    'CARGA PAGA (KG)': 'carga_paga_kg',
+    'CARGA GRÁTIS (KG)': 'carga_gratis_kg',
+    'CORREIO (KG)': 'correio_kg',
+    'ASK': 'ask',
+    'RPK': 'rpk',
+    'ATK': 'atk',
+    'RTK': 'rtk',
+    'COMBUSTÍVEL (LITROS)': 'combustivel_litros',
+    'DISTÂNCIA VOADA (KM)': 'distancia_voada_km',
+    'DECOLAGENS': 'decolagens',
+    'CARGA PAGA KM': 'carga_paga_km',
+    'CARGA GRATIS KM': 'carga_gratis_km',
+    'CORREIO KM': 'correio_km',
+    'ASSENTOS': 'assentos',
+    'PAYLOAD': 'payload',
+    'HORAS VOADAS': 'horas_voadas',
+    'BAGAGEM (KG)': 'bagagem_kg'
+}
+
+# Tipos de cada coluna do CSV, espelhando voos_carga (data/esquema.py).
+# Colunas INTEGER são lidas como float (o CSV pode ter linhas vazias) e
+# convertidas para int depois do dropna.
+TIPOS_VOOS = {
+    'empresa_sigla': 'TEXT',
+    'empresa_nome': 'TEXT',
+    'empresa_nacionalidade': 'TEXT',
+    'ano': 'INTEGER',
+    'mes': 'INTEGER',
+    'origem_sigla': 'TEXT',
+    'origem_nome': 'TEXT',
+    'origem_pais': 'TEXT',
+    'origem_continente': 'TEXT',
+    'destino_sigla': 'TEXT',
+    'destino_nome': 'TEXT',
+    'destino_pais': 'TEXT',
+    'destino_continente': 'TEXT',
+    'natureza': 'TEXT',
+    'grupo_voo': 'TEXT',
+    'passageiros_pagos': 'INTEGER',
+    'passageiros_gratis': 'INTEGER',
+    'carga_paga_kg': 'REAL',
+    'carga_gratis_kg': 'REAL',
+    'correio_kg': 'REAL',
+    'ask': 'REAL',
+    'rpk': 'REAL',
+    'atk': 'REAL',
+    'rtk': 'REAL',
+    'combustivel_litros': 'REAL',
+    'distancia_voada_km': 'REAL',
+    'decolagens': 'INTEGER',
+    'carga_paga_km': 'REAL',
+    'carga_gratis_km': 'REAL',
+    'correio_km': 'REAL',
+    'assentos': 'INTEGER',
+    'payload': 'REAL',
+    'horas_voadas': 'REAL',
+    'bagagem_kg': 'REAL'
+}
+
+DTYPES_LEITURA = {
+    csv: (str if TIPOS_VOOS[col] == 'TEXT' else 'float64')
+    for csv, col in COLUNAS_CSV.items()
+}
+
+COLUNAS_INTEIRAS = [col for col, tipo in TIPOS_VOOS.items() if tipo == 'INTEGER']
+
+# Linhas lidas do CSV por vez; mantém o pico de memória constante
+TAMANHO_CHUNK = 50_000
+
+# Processos que leem e limpam CSVs em paralelo (um arquivo por processo);
+# a gravação no SQLite continua num único processo. Com 1, tudo é feito em
+# sequência, em streaming. O app usa 1 por padrão (a carga roda dentro do
+# servidor do Streamlit); python -m data.CriacaoBD usa todos os núcleos.
+PROCESSOS_CARGA = int(os.environ.get("ANAC_PROCESSOS_CARGA", 1))
+
+# Motor das consultas das páginas: 'sqlite' (padrão) ou 'duckdb', que lê
+# cópias em Parquet das tabelas de cada geração (data/motor_duckdb.py)
+MOTOR_CONSULTAS = os.environ.get("ANAC_MOTOR_CONSULTAS", "sqlite").lower()
+
+# Tabelas exportadas para Parquet; as visões são recriadas sobre elas
+TABELAS_PARQUET = (
+    "continentes_dim", "paises_dim", "aeroportos_dim", "empresas_dim",
+    "voos_fato", "resumo_mensal", "kpis_gerais",
+)
+
+# PRAGMAs da carga em massa. O arquivo novo só é publicado depois de
+# validado, e é descartado se a carga falhar, então journal e fsync podem
+# ser desligados com segurança.
+PRAGMAS_CARGA = {
+    "journal_mode": "OFF",
+    "synchronous": "OFF",
+    "locking_mode": "EXCLUSIVE",
+    "temp_store": "FILE",  # a tabela de carga pode ter o histórico inteiro; não cabe em memória
+    "cache_size": -256 * 1024,  # 256 MB
+}
+
+# Incrementar sempre que o esquema do banco mudar, para forçar a reconstrução
+SCHEMA_VERSION = 13
+
+# Impede duas sessões de reconstruírem o banco ao mesmo tempo. O lock de
+# thread serializa as sessões do processo; a trava no arquivo, as réplicas
+# que compartilham DATA_DIR (senão duas montariam a mesma geração).
+_lock_construcao = threading.Lock()
+
+# Carga disparada pelo app em segundo plano (iniciar_carga)
+_lock_thread_carga = threading.Lock()
+_thread_carga = None
+
+def _travar_arquivo(arquivo, esperar):
+    # True se a trava foi obtida; com esperar=False não bloqueia
+    if fcntl is not None:
+        try:
+            fcntl.flock(arquivo, fcntl.LOCK_EX | (0 if esperar else fcntl.LOCK_NB))
+            return True
+        except BlockingIOError:
+            return False
+    # LK_LOCK desiste depois de ~10 s; tenta de novo até conseguir
+    while True:
+        try:
+            arquivo.seek(0)
+            msvcrt.locking(arquivo.fileno(), msvcrt.LK_LOCK if esperar else msvcrt.LK_NBLCK, 1)
+            return True
+        except OSError:
+            if not esperar:
+                return False
+
+@contextmanager
+def _travar_construcao(esperar=True):
+    # Entrega True com a trava obtida, ou False se esperar=False e outra
+    # sessão ou réplica já está construindo
+    if not _lock_construcao.acquire(blocking=esperar):
+        yield False
+        return
+    try:
+        with open(LOCK_PATH, "a+b") as arquivo:
+            if not _travar_arquivo(arquivo, esperar):
+                yield False
+                return
+            try:
+                yield True
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(arquivo, fcntl.LOCK_UN)
+                else:
+                    arquivo.seek(0)
+                    msvcrt.locking(arquivo.fileno(), msvcrt.LK_UNLCK, 1)
+    finally:
+        _lock_construcao.release()
+
+def _hash_arquivo(caminho):
+    sha = hashlib.sha256()
+    with open(caminho, "rb") as f:
+        for bloco in iter(lambda: f.read(1024 * 1024), b""):
+            sha.update(bloco)
+    return sha.hexdigest()
+
+def _ler_manifesto():
+    try:
+        with open(MANIFESTO_PATH, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def _gravar_manifesto(manifesto):
+    tmp = MANIFESTO_PATH + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifesto, f, indent=2)
+    os.replace(tmp, MANIFESTO_PATH)
+
+def _caminho_geracao(geracao):
+    return os.path.join(DATA_DIR, f"voos_{geracao}.db")
+
+def _caminho_parquet(geracao):
+    return os.path.join(DATA_DIR, f"voos_{geracao}_parquet")
+
+def banco_atual():
+    # (geração, caminho) do banco publicado pelo manifesto, ou (None, None)
+    manifesto = _ler_manifesto()
+    if not manifesto or "geracao" not in manifesto:
+        return None, None
+    return manifesto["geracao"], _caminho_geracao(manifesto["geracao"])
+
+def descobrir_arquivos():
+    # Nome do arquivo -> os.stat, em ordem de nome
+    nomes = sorted(
+        nome for nome in os.listdir(DATA_DIR)
+        if any(fnmatch.fnmatch(nome, padrao) for padrao in PADROES_CSV)
+    )
+    return {nome: os.stat(os.path.join(DATA_DIR, nome)) for nome in nomes}
+
+def _vencedores(cobertura, periodos):
+    # Para cada período, o último arquivo (em ordem de nome) que o cobre
+    vencedores = {}
+    for nome in sorted(cobertura):
+        for chave in cobertura[nome]:
+            if chave in periodos:
+                vencedores[chave] = nome
+    return vencedores
+
+def _base_valida(manifesto):
+    return (
+        manifesto is not None
+        and manifesto.get("schema_version") == SCHEMA_VERSION
+        and os.path.exists(_caminho_geracao(manifesto.get("geracao")))
+    )
+
+def _pendencias(manifesto, arquivos):
+    # Retorna (alterados, removidos) em relação ao manifesto. Arquivos com
+    # mtime diferente mas mesmo conteúdo só têm o mtime atualizado.
+    if not _base_valida(manifesto):
+        return list(arquivos), []
+
+    registrados = manifesto.get("arquivos", {})
+    alterados = []
+    mtime_atualizado = False
+    for nome, stat in arquivos.items():
+        registro = registrados.get(nome)
+        if registro is None or registro["tamanho"] != stat.st_size:
+            alterados.append(nome)
+        elif registro["mtime"] != stat.st_mtime_ns:
+            if registro["sha256"] != _hash_arquivo(os.path.join(DATA_DIR, nome)):
+                alterados.append(nome)
+            else:
+                registro["mtime"] = stat.st_mtime_ns
+                mtime_atualizado = True
+    removidos = [nome for nome in registrados if nome not in arquivos]
+
+    if mtime_atualizado and not alterados and not removidos:
+        _gravar_manifesto(manifesto)
+    return alterados, removidos
+
+def _ler_chunks(caminho, tamanho_chunk):
+    leitor = pd.read_csv(
+        caminho,
+        sep=';',
+        encoding='latin-1',
+        decimal=',',
+        dtype=DTYPES_LEITURA,
+        usecols=lambda col: col not in COLUNAS_DESCARTADAS,
+        chunksize=tamanho_chunk,
+    )
+    for chunk in leitor:
+        chunk.dropna(inplace=True)
+        chunk.rename(columns=COLUNAS_CSV, inplace=True)
+        chunk[COLUNAS_INTEIRAS] = chunk[COLUNAS_INTEIRAS].astype('int64')
+        yield chunk
 
-    cursor.execute('''
-    CREATE TABLE IF NOT EXISTS voos (
-        empresa_sigla TEXT,
-        empresa_nome TEXT,
-        empresa_nacionalidade TEXT,
-        ano INTEGER,
-        mes INTEGER,
-        origem_sigla TEXT,
-        origem_nome TEXT,
-        origem_pais TEXT,
-        origem_continente TEXT,
-        destino_sigla TEXT,
-        destino_nome TEXT,
-        destino_pais TEXT,
-        destino_continente TEXT,
-        natureza TEXT,
-        grupo_voo TEXT,
-        passageiros_pagos INTEGER,
-        passageiros_gratis INTEGER,
-        carga_paga_kg REAL, -- Alterado para REAL caso haja valores decimais
-        carga_gratis_kg REAL, -- Alterado para REAL
-        correio_kg REAL, -- Alterado para REAL
-        ask REAL, -- ASK, RPK, ATK, RTK geralmente são reais
-        rpk REAL,
-        atk REAL,
-        rtk REAL,
-        combustivel_litros REAL, -- Alterado para REAL
-        distancia_voada_km REAL, -- Alterado para REAL
-        decolagens INTEGER,
-        carga_paga_km REAL, -- Alterado para REAL
-        carga_gratis_km REAL, -- Alterado para REAL
-        correio_km REAL, -- Alterado para REAL
-        assentos INTEGER,
-        payload REAL, -- PAYLOAD geralmente é REAL
-        horas_voadas REAL,
-        bagagem_kg REAL -- BAGAGEM (KG) pode ser real
+def _chave_periodo(ano, mes):
+    return f"{ano:04d}-{mes:02d}"
+
+def _criar_aeroportos_dim(cursor):
+    aeroportos = cursor.execute(esquema.SELECT_AEROPORTOS_CARGA).fetchall()
+    # A base do airportsdata só é carregada se houver aeroporto novo
+    base = airportsdata.load('ICAO') if any(not existente for *_, existente in aeroportos) else {}
+    linhas = []
+    for sigla, nome, pais, existente in aeroportos:
+        aeroporto = base.get(sigla)
+        if existente:
+            # Só nome e país são atualizados (INSERT_AEROPORTO)
+            linhas.append((sigla, nome, pais, None, None, None))
+        elif aeroporto:
+            linhas.append((sigla, nome, pais, aeroporto['lat'], aeroporto['lon'], 'resolvido'))
+        else:
+            linhas.append((sigla, nome, pais, None, None, 'sem_coordenadas'))
+    cursor.executemany(esquema.INSERT_AEROPORTO, linhas)
+
+def _criar_esquema(cursor):
+    for create in esquema.CREATE_DIMENSOES:
+        cursor.execute(create)
+    cursor.execute(esquema.CREATE_VOOS_FATO)
+    cursor.execute(esquema.CREATE_VIEW_VOOS)
+    cursor.execute(esquema.CREATE_RESUMO_MENSAL)
+    cursor.execute(esquema.CREATE_KPIS_GERAIS)
+    cursor.execute(esquema.CREATE_VIEW_AEROPORTOS)
+    cursor.execute(esquema.CREATE_VOOS_CARGA)
+    cursor.execute(esquema.CREATE_PERIODOS_AFETADOS)
+
+def _ler_arquivo(nome, tamanho_chunk, diretorio):
+    # Executado nos processos do pool: grava cada lote já tipado e limpo
+    # (DataFrame de até tamanho_chunk linhas) num arquivo em `diretorio` e
+    # devolve só os caminhos, então nenhum processo guarda o arquivo inteiro
+    caminhos = []
+    for i, chunk in enumerate(_ler_chunks(os.path.join(DATA_DIR, nome), tamanho_chunk)):
+        caminho = os.path.join(diretorio, f"{nome}.{i:06d}.pkl")
+        chunk.to_pickle(caminho)
+        caminhos.append(caminho)
+    return caminhos
+
+def _gravar_chunk(cursor, nome, chunk, cobertura):
+    colunas = list(COLUNAS_CSV.values())
+    insert = (
+        f"INSERT INTO voos_carga (arquivo, {', '.join(colunas)}) "
+        f"VALUES ({', '.join('?' * (len(colunas) + 1))})"
     )
-    ''')
-    conn.commit()
-
-    df.rename(columns={
-        'EMPRESA (SIGLA)': 'empresa_sigla',
-        'EMPRESA (NOME)': 'empresa_nome',
-        'EMPRESA (NACIONALIDADE)': 'empresa_nacionalidade',
-        'ANO': 'ano',
-        'MÊS': 'mes',
-        'AEROPORTO DE ORIGEM (SIGLA)': 'origem_sigla',
-        'AEROPORTO DE ORIGEM (NOME)': 'origem_nome',
-        'AEROPORTO DE ORIGEM (PAÍS)': 'origem_pais',
-        'AEROPORTO DE ORIGEM (CONTINENTE)': 'origem_continente',
-        'AEROPORTO DE DESTINO (SIGLA)': 'destino_sigla',
-        'AEROPORTO DE DESTINO (NOME)': 'destino_nome',
-        'AEROPORTO DE DESTINO (PAÍS)': 'destino_pais',
-        'AEROPORTO DE DESTINO (CONTINENTE)': 'destino_continente',
-        'NATUREZA': 'natureza',
-        'GRUPO DE VOO': 'grupo_voo',
-        'PASSAGEIROS PAGOS': 'passageiros_pagos',
-        'PASSAGEIROS GRÁTIS': 'passageiros_gratis',
-        'CARGA PAGA (KG)': 'carga_paga_kg',
-        'CARGA GRÁTIS (KG)': 'carga_gratis_kg',
-        'CORREIO (KG)': 'correio_kg',
-        'ASK': 'ask',
-        'RPK': 'rpk',
-        'ATK': 'atk',
-        'RTK': 'rtk',
-        'COMBUSTÍVEL (LITROS)': 'combustivel_litros',
-        'DISTÂNCIA VOADA (KM)': 'distancia_voada_km',
-        'DECOLAGENS': 'decolagens',
-        'CARGA PAGA KM': 'carga_paga_km',
-        'CARGA GRATIS KM': 'carga_gratis_km',
-        'CORREIO KM': 'correio_km',
-        'ASSENTOS': 'assentos',
-        'PAYLOAD': 'payload',
-        'HORAS VOADAS': 'horas_voadas',
-        'BAGAGEM (KG)': 'bagagem_kg'
-    }, inplace=True)
-
-    df.to_sql("voos", conn, if_exists="replace", index=False)
-
-    conn.commit()
-    conn.close()
+    # Colunas convertidas para listas Python de uma vez (bem mais rápido que itertuples)
+    lote = zip([nome] * len(chunk), *(chunk[col].tolist() for col in colunas))
+    cursor.executemany(insert, lote)
+    for (ano, mes), linhas in chunk.groupby(['ano', 'mes']).size().items():
+        chave = _chave_periodo(ano, mes)
+        cobertura[chave] = cobertura.get(chave, 0) + int(linhas)
+
+def _carregar_arquivos(cursor, nomes, tamanho_chunk, processos):
+    # Lê os CSVs para a tabela de carga. Retorna {arquivo: {periodo: linhas}}.
+    coberturas = {nome: {} for nome in nomes}
+    if processos <= 1 or len(nomes) <= 1:
+        for nome in nomes:
+            for chunk in _ler_chunks(os.path.join(DATA_DIR, nome), tamanho_chunk):
+                _gravar_chunk(cursor, nome, chunk, coberturas[nome])
+        return coberturas
+
+    # Os lotes passam por arquivos temporários e são gravados um de cada vez:
+    # a memória fica em um lote por processo. No máximo `processos` arquivos
+    # em leitura ou aguardando gravação, para o disco temporário também não
+    # crescer com o histórico. 'spawn' porque fork dentro do servidor do
+    # Streamlit (com outras threads ativas) pode travar o processo filho.
+    diretorio = tempfile.mkdtemp(prefix="carga_", suffix=".tmp", dir=DATA_DIR)
+    contexto = multiprocessing.get_context("spawn")
+    try:
+        with ProcessPoolExecutor(max_workers=min(processos, len(nomes)), mp_context=contexto) as pool:
+            fila = iter(nomes)
+            pendentes = deque(
+                (nome, pool.submit(_ler_arquivo, nome, tamanho_chunk, diretorio))
+                for nome in itertools.islice(fila, processos)
+            )
+            while pendentes:
+                nome, futuro = pendentes.popleft()
+                caminhos = futuro.result()
+                proximo = next(fila, None)
+                if proximo is not None:
+                    pendentes.append((proximo, pool.submit(_ler_arquivo, proximo, tamanho_chunk, diretorio)))
+                for caminho in caminhos:
+                    _gravar_chunk(cursor, nome, pd.read_pickle(caminho), coberturas[nome])
+                    os.remove(caminho)
+    finally:
+        shutil.rmtree(diretorio, ignore_errors=True)
+    return coberturas
+
+def _criar_indices(cursor):
+    for nome, (tabela, colunas) in esquema.INDICES.items():
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS {nome} ON {tabela} ({', '.join(colunas)})")
+    # Estatísticas para o planejador escolher os índices
+    cursor.execute("ANALYZE")
+
+def _validar_banco(caminho, cobertura):
+    conn = sqlite3.connect(caminho)
+    try:
+        problemas = [linha for (linha,) in conn.execute("PRAGMA quick_check") if linha != "ok"]
+        if problemas:
+            raise RuntimeError(f"Banco {caminho} corrompido: {problemas[:5]}")
+        # Cada partição precisa ter exatamente as linhas lidas do arquivo vencedor
+        no_banco = {
+            _chave_periodo(ano, mes): linhas
+            for ano, mes, linhas in conn.execute("SELECT ano, mes, COUNT(*) FROM voos_fato GROUP BY ano, mes")
+        }
+        todos = {chave for periodos in cobertura.values() for chave in periodos}
+        esperado = {
+            chave: cobertura[nome][chave]
+            for chave, nome in _vencedores(cobertura, todos).items()
+        }
+        if no_banco != esperado:
+            diferencas = sorted(set(no_banco.items()) ^ set(esperado.items()))
+            raise RuntimeError(f"Banco {caminho} incompleto; partições divergentes: {diferencas[:5]}")
+        # As visões usadas pelas páginas precisam compilar
+        for objeto in ("voos", "aeroportos", "resumo_mensal", "kpis_gerais"):
+            conn.execute(f"SELECT * FROM {objeto} LIMIT 1").fetchall()
+    finally:
+        conn.close()
+
+def _remover_geracoes_antigas(geracao_atual, geracao_anterior=None):
+    # Conexões SQLite ainda abertas na geração antiga continuam funcionando
+    # (POSIX); no Windows o arquivo fica em uso e é removido numa próxima
+    # carga. Já as visões do DuckDB leem o Parquet pelo caminho, a cada
+    # consulta: a exportação da geração anterior só sai na carga seguinte,
+    # para as consultas que já a tinham resolvido terminarem.
+    manter = {os.path.basename(_caminho_parquet(g)) for g in (geracao_atual, geracao_anterior) if g is not None}
+    for nome in os.listdir(DATA_DIR):
+        if nome.startswith("voos_") and nome.endswith("_parquet"):
+            if nome not in manter:
+                shutil.rmtree(os.path.join(DATA_DIR, nome), ignore_errors=True)
+            continue
+        if not (nome.startswith("voos_") and ".db" in nome):
+            continue
+        if nome.startswith(f"voos_{geracao_atual}.db"):
+            continue
+        try:
+            os.remove(os.path.join(DATA_DIR, nome))
+        except OSError:
+            pass
+
+def _tipo_arrow(pa, declarado):
+    # Afinidade de tipo do SQLite -> tipo Arrow
+    declarado = (declarado or "").upper()
+    if "INT" in declarado:
+        return pa.int64()
+    if any(t in declarado for t in ("REAL", "FLOA", "DOUB")):
+        return pa.float64()
+    return pa.string()
+
+def exportar_parquet(geracao, caminho, linhas_por_grupo=TAMANHO_CHUNK * 4):
+    # Exporta as tabelas da geração para data/voos_<geracao>_parquet/.
+    # Idempotente: se a exportação já existe, só devolve o diretório.
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    destino = _caminho_parquet(geracao)
+    if os.path.isdir(destino):
+        return destino
+    temporario = f"{destino}.{os.getpid()}.{threading.get_ident()}.tmp"
+    shutil.rmtree(temporario, ignore_errors=True)
+    os.makedirs(temporario)
+    conn = sqlite3.connect(f"file:{caminho}?mode=ro", uri=True)
+    try:
+        for tabela in TABELAS_PARQUET:
+            info = conn.execute(f"PRAGMA table_info({tabela})").fetchall()
+            schema = pa.schema([(col[1], _tipo_arrow(pa, col[2])) for col in info])
+            cursor = conn.execute(f"SELECT {', '.join(schema.names)} FROM {tabela}")
+            with pq.ParquetWriter(os.path.join(temporario, f"{tabela}.parquet"), schema) as escritor:
+                while True:
+                    linhas = cursor.fetchmany(linhas_por_grupo)
+                    if not linhas:
+                        break
+                    colunas = [
+                        pa.array(valores, type=campo.type)
+                        for valores, campo in zip(zip(*linhas), schema)
+                    ]
+                    escritor.write_table(pa.Table.from_arrays(colunas, schema=schema))
+    except BaseException:
+        shutil.rmtree(temporario, ignore_errors=True)
+        raise
+    finally:
+        conn.close()
+
+    try:
+        os.rename(temporario, destino)
+    except OSError:
+        # Outro processo publicou a mesma exportação antes
+        shutil.rmtree(temporario, ignore_errors=True)
+        if not os.path.isdir(destino):
+            raise
+    return destino
+
+def _copiar_banco(origem, destino):
+    # Cópia consistente da geração publicada via API de backup do SQLite
+    src = sqlite3.connect(f"file:{origem}?mode=ro", uri=True)
+    dst = sqlite3.connect(destino)
+    try:
+        src.backup(dst)
+    finally:
+        dst.close()
+        src.close()
+
+def _construir_banco(caminho, alterados, removidos, cobertura, tamanho_chunk, processos):
+    # Aplica os arquivos alterados/removidos sobre o banco em `caminho`
+    # (cópia da geração anterior, ou vazio numa reconstrução completa),
+    # substituindo só as partições (ano, mês) que eles cobrem.
+    # `cobertura` (arquivo -> {periodo: linhas}) é atualizada no lugar.
+    # Retorna as linhas lidas dos CSVs e as inseridas e substituídas
+    # (removidas das partições refeitas) em voos_fato.
+    conn = sqlite3.connect(caminho, isolation_level=None)
+    cursor = conn.cursor()
+    for nome, valor in PRAGMAS_CARGA.items():
+        cursor.execute(f"PRAGMA {nome} = {valor}")
+    try:
+        cursor.execute("BEGIN")
+        _criar_esquema(cursor)
+
+        # Partições que os arquivos alterados/removidos cobriam antes
+        afetados = set()
+        for nome in list(alterados) + list(removidos):
+            afetados.update(cobertura.pop(nome, {}))
+
+        lidos = _carregar_arquivos(cursor, alterados, tamanho_chunk, processos)
+        cobertura.update(lidos)
+        for periodos in lidos.values():
+            afetados.update(periodos)
+        linhas_lidas = sum(sum(periodos.values()) for periodos in lidos.values())
+
+        # Arquivos inalterados que voltam a ser os vencedores de uma partição
+        # afetada (ex.: um arquivo mensal que a sobrescrevia foi removido)
+        vencedores = _vencedores(cobertura, afetados)
+        relidos = _carregar_arquivos(cursor, sorted(set(vencedores.values()) - set(lidos)), tamanho_chunk, processos)
+        linhas_lidas += sum(sum(periodos.values()) for periodos in relidos.values())
+
+        cursor.executemany(
+            "INSERT INTO periodos_afetados (ano, mes, arquivo) VALUES (?, ?, ?)",
+            [(*map(int, chave.split("-")), vencedores.get(chave)) for chave in sorted(afetados)],
+        )
+        linhas_substituidas = cursor.execute(esquema.DELETE_FATO_PERIODOS).rowcount
+
+        cursor.execute(esquema.INSERT_CONTINENTES)
+        cursor.execute(esquema.INSERT_PAISES)
+        _criar_aeroportos_dim(cursor)
+        cursor.execute(esquema.INSERT_EMPRESAS)
+        linhas_inseridas = cursor.execute(esquema.INSERT_VOOS_FATO).rowcount
+        for limpar in esquema.LIMPAR_DIMENSOES:
+            cursor.execute(limpar)
+
+        _criar_indices(cursor)
+        cursor.execute(esquema.DELETE_RESUMO_PERIODOS)
+        cursor.execute(esquema.INSERT_RESUMO_MENSAL)
+        cursor.execute("DELETE FROM kpis_gerais")
+        cursor.execute(esquema.INSERT_KPIS_GERAIS)
+        cursor.execute("DROP TABLE voos_carga")
+        cursor.execute("DROP TABLE periodos_afetados")
+        cursor.execute("COMMIT")
+    except BaseException:
+        if conn.in_transaction:
+            conn.rollback()
+        raise
+    finally:
+        conn.close()
+    return linhas_lidas, linhas_inseridas, linhas_substituidas
+
+def criarTable(forcar=False, tamanho_chunk=TAMANHO_CHUNK, processos=PROCESSOS_CARGA, esperar=True):
+    # esperar=False: se outra sessão ou réplica já está construindo, retorna
+    # na hora em vez de esperar a carga dela terminar
+    arquivos = descobrir_arquivos()
+    if not forcar and _pendencias(_ler_manifesto(), arquivos) == ([], []):
+        return
+
+    with _travar_construcao(esperar) as travado:
+        if not travado:
+            return
+        manifesto = _ler_manifesto()
+        alterados, removidos = _pendencias(manifesto, arquivos)
+        # Outra sessão (ou réplica) pode ter terminado a carga enquanto esperávamos o lock
+        if not forcar and not alterados and not removidos:
+            return
+
+        incremental = not forcar and _base_valida(manifesto)
+        if not incremental:
+            alterados, removidos = list(arquivos), []
+
+        # A nova geração é montada num arquivo separado; o banco publicado
+        # continua atendendo as páginas até a troca do manifesto.
+        geracao = (manifesto or {}).get("geracao", 0) + 1
+        caminho = _caminho_geracao(geracao)
+        for sufixo in ("", "-journal"):
+            if os.path.exists(caminho + sufixo):
+                os.remove(caminho + sufixo)
+        shutil.rmtree(_caminho_parquet(geracao), ignore_errors=True)
+
+        registrados = manifesto.get("arquivos", {}) if incremental else {}
+        cobertura = {nome: dict(registro["periodos"]) for nome, registro in registrados.items()}
+        inicio = time.perf_counter()
+        try:
+            if incremental:
+                _copiar_banco(_caminho_geracao(manifesto["geracao"]), caminho)
+            linhas_lidas, linhas_inseridas, linhas_substituidas = _construir_banco(caminho, alterados, removidos, cobertura, tamanho_chunk, processos)
+            _validar_banco(caminho, cobertura)
+            if MOTOR_CONSULTAS == "duckdb":
+                exportar_parquet(geracao, caminho)
+        except BaseException:
+            if os.path.exists(caminho):
+                os.remove(caminho)
+            shutil.rmtree(_caminho_parquet(geracao), ignore_errors=True)
+            raise
+
+        # Troca atômica: leitores passam para a nova geração na próxima conexão
+        registrados = {nome: registro for nome, registro in registrados.items() if nome not in removidos}
+        for nome in alterados:
+            stat = arquivos[nome]
+            registrados[nome] = {
+                "tamanho": stat.st_size,
+                "mtime": stat.st_mtime_ns,
+                "sha256": _hash_arquivo(os.path.join(DATA_DIR, nome)),
+                "periodos": cobertura[nome],
+            }
+        _gravar_manifesto({
+            "schema_version": SCHEMA_VERSION,
+            "geracao": geracao,
+            "arquivos": dict(sorted(registrados.items())),
+        })
+        _remover_geracoes_antigas(geracao, (manifesto or {}).get("geracao"))
+
+        segundos = time.perf_counter() - inicio
+        estatisticas = {
+            "geracao": geracao,
+            "incremental": incremental,
+            "arquivos": alterados,
+            "linhas_lidas": linhas_lidas,
+            "linhas_inseridas": linhas_inseridas,
+            "linhas_substituidas": linhas_substituidas,
+            "segundos": round(segundos, 3),
+            # Vazão da leitura + gravação, sobre as linhas lidas dos CSVs
+            "linhas_por_segundo": round(linhas_lidas / segundos) if segundos else None,
+        }
+        logger.info(
+            "Geração %d publicada (%s, %d arquivo(s)): %d linhas lidas, %d inseridas e %d substituídas "
+            "em voos_fato, em %.2f s (%s linhas lidas/s)",
+            geracao, "incremental" if incremental else "completa", len(alterados),
+            linhas_lidas, linhas_inseridas, linhas_substituidas, segundos, estatisticas["linhas_por_segundo"],
+        )
+        return estatisticas
+
+def _carga_segundo_plano():
+    try:
+        criarTable(esperar=False)
+    except Exception:
+        # A geração publicada continua atendendo; a próxima execução tenta de novo
+        logger.exception("Falha na carga em segundo plano")
+
+def iniciar_carga():
+    # Usado pelo app a cada execução. Sem banco publicado a primeira carga é
+    # feita na hora (não há o que mostrar antes dela); depois, arquivos
+    # novos ou alterados são carregados numa thread e as páginas continuam
+    # lendo a geração publicada até a troca do manifesto.
+    global _thread_carga
+    if banco_atual()[0] is None:
+        criarTable()
+        return
+    if _pendencias(_ler_manifesto(), descobrir_arquivos()) == ([], []):
+        return
+    with _lock_thread_carga:
+        if _thread_carga is not None and _thread_carga.is_alive():
+            return
+        _thread_carga = threading.Thread(target=_carga_segundo_plano, name="carga", daemon=True)
+        _thread_carga.start()
+
+if __name__ == "__main__":
+    # python -m data.CriacaoBD força a reconstrução do banco
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    criarTable(forcar=True, processos=int(os.environ.get("ANAC_PROCESSOS_CARGA", os.cpu_count() or 1)))
@@ -0,0 +1,122 @@
+import logging
+import threading
+import time
+
+from data import cache_consultas
+from data.conexao import geracao_atual, ler_sql
+from data.filtros import SEM_FILTROS, carregar_opcoes
+from data.kpis import carregar_kpis
+from data.memoria import memorizado
+from data.paginas import aeroportos, dashboard, eficiencia, empresas
+
+logger = logging.getLogger(__name__)
+
+# Aquecimento dos caches compartilhados depois de um reinício ou de uma nova
+# carga. Roda numa thread em segundo plano iniciada pelo main.py e nunca
+# bloqueia as páginas: uma página aberta antes do fim só encontra menos
+# resultados prontos. Calcula as opções dos filtros e o estado inicial de
+# cada página (sem filtros, primeiro item de cada seletor) nos mesmos caches
+# em memória que as páginas leem (data/memoria.py), o que vale mesmo num
+# deploy novo com o cache vazio, e depois refaz as consultas registradas
+# pelo cache em disco (data/cache_consultas.py), se ele estiver ligado.
+
+def _estado_inicial_aeroportos():
+    # Primeiro país e primeiro aeroporto dos seletores da seção por aeroporto
+    paises = memorizado(aeroportos.carregar_paises)()
+    lista = memorizado(aeroportos.carregar_aeroportos_pais)(paises[0]) if paises else []
+    # Os voos do aeroporto só ficam no cache em disco (frontend/aeroportos.py)
+    if lista and cache_consultas.ativo():
+        aeroportos.carregar_voos_aeroporto(lista[0].split(" - ")[0], SEM_FILTROS)
+
+def _estado_inicial_empresas():
+    # Primeira empresa do seletor da evolução mensal
+    nomes = memorizado(empresas.load_empresas)(SEM_FILTROS)
+    if nomes:
+        memorizado(empresas.load_horas_temporal_empresa)(nomes[0], SEM_FILTROS)
+
+# (descrição, função, argumentos), com os mesmos argumentos das páginas,
+# para os resultados caírem nas mesmas chaves dos caches em memória
+ESTADO_INICIAL = [
+    ("KPIs", carregar_kpis, (SEM_FILTROS,)),
+    ("dashboard: aeroportos", memorizado(dashboard.carregar_nomes_aeroportos), (SEM_FILTROS,)),
+    ("dashboard: mapa", memorizado(dashboard.carregar_mapa), ("Todos", "Todos", SEM_FILTROS)),
+    ("dashboard: passageiros", memorizado(dashboard.carregar_passageiros_mes), (SEM_FILTROS,)),
+    ("dashboard: carga", memorizado(dashboard.carregar_carga_mes), (SEM_FILTROS,)),
+    ("dashboard: correio", memorizado(dashboard.carregar_correio_mes), (SEM_FILTROS,)),
+    ("dashboard: naturezas", memorizado(dashboard.carregar_naturezas), (SEM_FILTROS,)),
+    ("aeroportos: top 10", memorizado(aeroportos.carregar_top10), (SEM_FILTROS,)),
+    ("aeroportos: naturezas", memorizado(aeroportos.carregar_naturezas), ()),
+    ("aeroportos: destinos", memorizado(aeroportos.carregar_destinos), ("Todas", SEM_FILTROS)),
+    ("aeroportos: continentes", memorizado(aeroportos.carregar_continentes), ()),
+    ("aeroportos: aeroporto", _estado_inicial_aeroportos, ()),
+    ("empresas: dados", memorizado(empresas.carregar_dados), (SEM_FILTROS,)),
+    ("empresas: métricas", memorizado(empresas.carregar_metricas), (SEM_FILTROS,)),
+    ("empresas: ranking de horas", memorizado(empresas.load_ranking_horas), (5, SEM_FILTROS)),
+    ("empresas: evolução mensal", _estado_inicial_empresas, ()),
+    ("empresas: consumo top 10", memorizado(empresas.carregar_consumo_top10), (SEM_FILTROS,)),
+    ("empresas: consumo", memorizado(empresas.carregar_consumo_combustivel), (SEM_FILTROS,)),
+    ("eficiência: mensal", memorizado(eficiencia.carregar_eficiencia_mensal), (SEM_FILTROS,)),
+    ("eficiência: empresas", memorizado(eficiencia.carregar_totais_empresas), (SEM_FILTROS,)),
+    ("eficiência: consumo por país", memorizado(eficiencia.carregar_consumo_medio), ("origem_pais", SEM_FILTROS)),
+    ("eficiência: consumo por continente", memorizado(eficiencia.carregar_consumo_medio), ("origem_continente", SEM_FILTROS)),
+]
+
+_lock = threading.Lock()
+_estado = {"geracao": None, "total": 0, "feitas": 0, "terminado": False}
+
+def progresso():
+    with _lock:
+        return dict(_estado)
+
+def iniciar_aquecimento(opcoes_filtros=None):
+    # Uma vez por geração do banco; chamadas seguintes não fazem nada.
+    # opcoes_filtros: o cache do main.py (chave = geração), aquecido no
+    # lugar de carregar_opcoes para a barra lateral já encontrá-lo pronto.
+    geracao = geracao_atual()[0]
+    if geracao is None:
+        return
+    with _lock:
+        if _estado["geracao"] == geracao:
+            return
+        _estado.update(geracao=geracao, total=0, feitas=0, terminado=False)
+    threading.Thread(target=_aquecer, args=(geracao, opcoes_filtros), name="aquecimento", daemon=True).start()
+
+def _aquecer(geracao, opcoes_filtros=None):
+    inicio = time.perf_counter()
+    if opcoes_filtros is not None:
+        etapas = [("opções dos filtros", opcoes_filtros, (geracao,))]
+    else:
+        etapas = [("opções dos filtros", carregar_opcoes, ())]
+    etapas += ESTADO_INICIAL
+    # As consultas registradas só aquecem o cache em disco
+    if cache_consultas.ativo():
+        etapas += [
+            (cache_consultas.normalizar_sql(query)[:80], ler_sql, (query, params))
+            for query, params in cache_consultas.consultas_registradas()
+        ]
+    else:
+        logger.info("Cache de consultas em disco desligado: consultas registradas não serão refeitas")
+    with _lock:
+        _estado["total"] = len(etapas)
+
+    for descricao, funcao, args in etapas:
+        # Uma carga publicada no meio do caminho inicia outro aquecimento
+        if geracao_atual()[0] != geracao:
+            logger.info("Aquecimento da geração %s interrompido por uma nova carga", geracao)
+            return
+        try:
+            funcao(*args)
+        except Exception:
+            # Consulta registrada que não vale mais no esquema atual, por exemplo
+            logger.warning("Falha ao aquecer: %s", descricao, exc_info=True)
+        with _lock:
+            if _estado["geracao"] == geracao:
+                _estado["feitas"] += 1
+
+    with _lock:
+        if _estado["geracao"] == geracao:
+            _estado["terminado"] = True
+    logger.info(
+        "Cache aquecido (geração %s): %d etapas em %.1fs",
+        geracao, len(etapas), time.perf_counter() - inicio,
+    )
@@ -0,0 +1,284 @@
+import argparse
+import json
+import logging
+import os
+import subprocess
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from data import kpis
+from data.CriacaoBD import DATA_DIR, MOTOR_CONSULTAS, criarTable
+from data.filtros import SEM_FILTROS, Filtros, carregar_opcoes
+from data.paginas import aeroportos, dashboard, eficiencia, empresas
+
+try:
+    import resource
+except ImportError:  # Windows: sem pico de RSS
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+# Medição das consultas de cada página (data/paginas/ e data/kpis.py), sem
+# Streamlit, sobre bancos com 1×, 10× e 100× o arquivo de 2025. Cada escala
+# é montada uma vez em BENCHMARK_DIR/escala_<n>, com cópias do CSV em anos
+# anteriores (como o histórico da ANAC vai crescer), e reaproveitada nas
+# execuções seguintes. Cada página roda num processo próprio, com o cache de
+# consultas em disco desligado, para o pico de RSS ser só dela. Os tempos
+# (p50/p95) e o RSS são comparados com a base gravada por --gravar-base.
+#
+#   python -m data.benchmark                  # todas as escalas, compara com a base
+#   python -m data.benchmark --escalas 1 10
+#   python -m data.benchmark --gravar-base    # grava a base do motor atual
+
+BENCHMARK_DIR = os.environ.get("ANAC_BENCHMARK_DIR", os.path.join(DATA_DIR, "benchmark"))
+BASE_PATH = os.environ.get("ANAC_BENCHMARK_BASE", os.path.join(DATA_DIR, "benchmark_base.json"))
+CSV_ORIGEM = os.path.join(DATA_DIR, "resumo_anual_2025.csv")
+
+ESCALAS = (1, 10, 100)
+REPETICOES = 10
+PAGINAS = ("dashboard", "aeroportos", "empresas", "eficiencia")
+
+# Regressão: p95 ou pico de RSS acima da base por mais que a tolerância. No
+# tempo, a diferença também precisa passar de MIN_DIFERENCA_MS, para o ruído
+# das consultas de poucos milissegundos não disparar alarmes.
+TOLERANCIA = 0.25
+MIN_DIFERENCA_MS = 5.0
+
+def _kpis(filtros):
+    # Sem o lru_cache de data/kpis.py, que responderia as repetições
+    kpis._calcular.cache_clear()
+    return kpis.carregar_kpis(filtros)
+
+def _filtro_ultimo_ano():
+    ano = max(carregar_opcoes()["anos"])
+    return Filtros(anos=(ano, ano))
+
+# Casos de cada página: (nome, função, argumentos). Os valores escolhidos nos
+# seletores (origem, país, empresa...) são os de maior movimento no banco.
+def _casos_dashboard():
+    filtro = _filtro_ultimo_ano()
+    origem = aeroportos.carregar_destinos()["destino_nome"].iloc[0]
+    return [
+        ("kpis", _kpis, (SEM_FILTROS,)),
+        ("kpis_filtrado", _kpis, (filtro,)),
+        ("nomes_aeroportos", dashboard.carregar_nomes_aeroportos, ()),
+        ("destinos", dashboard.carregar_destinos, (origem,)),
+        ("mapa", dashboard.carregar_mapa, ()),
+        ("mapa_origem", dashboard.carregar_mapa, (origem,)),
+        ("mapa_filtrado", dashboard.carregar_mapa, ("Todos", "Todos", filtro)),
+        ("passageiros_mes", dashboard.carregar_passageiros_mes, ()),
+        ("carga_mes", dashboard.carregar_carga_mes, ()),
+        ("correio_mes", dashboard.carregar_correio_mes, ()),
+        ("naturezas", dashboard.carregar_naturezas, ()),
+    ]
+
+def _casos_aeroportos():
+    top10 = aeroportos.carregar_top10()
+    continente = top10["continente_destino"]["Continente"].iloc[0]
+    pais = top10["pais_destino"]["Pais"].iloc[0]
+    sigla = aeroportos.carregar_destinos()["destino_sigla"].iloc[0]
+    return [
+        ("kpis", _kpis, (SEM_FILTROS,)),
+        ("top10", aeroportos.carregar_top10, ()),
+        ("naturezas", aeroportos.carregar_naturezas, ()),
+        ("destinos", aeroportos.carregar_destinos, ()),
+        ("continentes", aeroportos.carregar_continentes, ()),
+        ("kpis_continente", aeroportos.carregar_kpis_continente, (continente,)),
+        ("decolagens_continente", aeroportos.carregar_decolagens_continente, (continente,)),
+        ("paises", aeroportos.carregar_paises, ()),
+        ("kpis_pais", aeroportos.carregar_kpis_pais, (pais,)),
+        ("decolagens_pais", aeroportos.carregar_decolagens_pais, (pais,)),
+        ("aeroportos_pais", aeroportos.carregar_aeroportos_pais, (pais,)),
+        ("voos_aeroporto", aeroportos.carregar_voos_aeroporto, (sigla,)),
+    ]
+
+def _casos_empresas():
+    empresa = empresas.load_ranking_horas(1)["empresa_nome"].iloc[0]
+    return [
+        ("dados", empresas.carregar_dados, ()),
+        ("metricas", empresas.carregar_metricas, ()),
+        ("ranking_horas", empresas.load_ranking_horas, (5,)),
+        ("empresas", empresas.load_empresas, ()),
+        ("horas_temporal", empresas.load_horas_temporal_empresa, (empresa,)),
+        ("consumo_top10", empresas.carregar_consumo_top10, ()),
+        ("consumo_combustivel", empresas.carregar_consumo_combustivel, ()),
+    ]
+
+def _casos_eficiencia():
+    empresa = empresas.load_ranking_horas(1)["empresa_nome"].iloc[0]
+    return [
+        ("kpis", _kpis, (SEM_FILTROS,)),
+        ("eficiencia_mensal", eficiencia.carregar_eficiencia_mensal, ()),
+        ("totais_empresas", eficiencia.carregar_totais_empresas, ()),
+        ("voos_empresas", eficiencia.carregar_voos_empresas, ((empresa,),)),
+        ("consumo_pais", eficiencia.carregar_consumo_medio, ("origem_pais",)),
+        ("consumo_continente", eficiencia.carregar_consumo_medio, ("origem_continente",)),
+    ]
+
+CASOS = {
+    "dashboard": _casos_dashboard,
+    "aeroportos": _casos_aeroportos,
+    "empresas": _casos_empresas,
+    "eficiencia": _casos_eficiencia,
+}
+
+def _rss_pico_mb():
+    if resource is None:
+        return None
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # KB no Linux, bytes no macOS
+    return pico / (1024 * 1024) if sys.platform == "darwin" else pico / 1024
+
+# ====================================
+# Processos filhos (DATA_DIR já aponta para a escala)
+# ====================================
+def preparar_escala(escala, origem):
+    # Uma cópia do CSV de origem por múltiplo, cada uma num ano anterior;
+    # as cópias que já existem são reaproveitadas
+    os.makedirs(DATA_DIR, exist_ok=True)
+    df = pd.read_csv(origem, sep=';', encoding='latin-1', dtype=str, keep_default_na=False)
+    anos = df['ANO'].astype(int)
+    for deslocamento in range(escala):
+        destino = os.path.join(DATA_DIR, f"resumo_anual_{anos.max() - deslocamento}.csv")
+        if os.path.exists(destino):
+            continue
+        temporario = f"{destino}.tmp"
+        df.assign(ANO=(anos - deslocamento).astype(str)).to_csv(temporario, sep=';', index=False, encoding='latin-1')
+        os.replace(temporario, destino)
+    # Só reconstrói se as cópias mudaram desde a última execução
+    estatisticas = criarTable()
+    if estatisticas:
+        logger.info("Escala %d×: %d linhas em %.1f s", escala, estatisticas["linhas_inseridas"], estatisticas["segundos"])
+
+def medir_pagina(pagina, repeticoes):
+    rss_inicial = _rss_pico_mb()
+    medidas = {}
+    for nome, funcao, args in CASOS[pagina]():
+        # A primeira chamada abre as conexões (ou a base DuckDB) e é medida à parte
+        inicio = time.perf_counter()
+        funcao(*args)
+        frio_ms = (time.perf_counter() - inicio) * 1000
+        tempos = []
+        for _ in range(repeticoes):
+            inicio = time.perf_counter()
+            funcao(*args)
+            tempos.append((time.perf_counter() - inicio) * 1000)
+        p50, p95 = np.percentile(tempos, [50, 95])
+        medidas[nome] = {"frio_ms": frio_ms, "p50_ms": p50, "p95_ms": p95, "max_ms": max(tempos)}
+    return {"rss_inicial_mb": rss_inicial, "rss_pico_mb": _rss_pico_mb(), "consultas": medidas}
+
+# ====================================
+# Processo principal
+# ====================================
+def _filho(escala, *args):
+    diretorio = os.path.join(BENCHMARK_DIR, f"escala_{escala}")
+    env = dict(
+        os.environ,
+        ANAC_DATA_DIR=diretorio,
+        ANAC_CACHE_CONSULTAS="0",
+        ANAC_LOG_LENTAS=os.path.join(diretorio, "logs", "consultas_lentas.log"),
+    )
+    processo = subprocess.run(
+        [sys.executable, "-m", "data.benchmark", *args],
+        env=env, stdout=subprocess.PIPE, text=True, check=True,
+    )
+    return processo.stdout
+
+def executar(escalas=ESCALAS, repeticoes=REPETICOES):
+    resultado = {
+        "motor": MOTOR_CONSULTAS,
+        "repeticoes": repeticoes,
+        "instante": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "escalas": {},
+    }
+    for escala in escalas:
+        _filho(escala, "--preparar", str(escala), "--origem", os.path.abspath(CSV_ORIGEM))
+        paginas = resultado["escalas"][str(escala)] = {}
+        for pagina in PAGINAS:
+            logger.info("Escala %d×: %s", escala, pagina)
+            paginas[pagina] = json.loads(_filho(escala, "--pagina", pagina, "--repeticoes", str(repeticoes)))
+    return resultado
+
+def _ler_base():
+    try:
+        with open(BASE_PATH, encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+def gravar_base(resultado):
+    # Uma base por motor de consultas: os tempos de SQLite e DuckDB não se comparam
+    base = _ler_base()
+    base[resultado["motor"]] = resultado
+    with open(BASE_PATH, "w", encoding="utf-8") as f:
+        json.dump(base, f, indent=2)
+
+def comparar(resultado, base, tolerancia=TOLERANCIA, min_diferenca_ms=MIN_DIFERENCA_MS):
+    # Tempos por (escala, página, consulta) e pico de RSS por (escala,
+    # página), com a base ao lado; 'regressao' marca o que passou da tolerância
+    tempos, memoria = [], []
+    for escala, paginas in resultado["escalas"].items():
+        for pagina, medida in paginas.items():
+            referencia = base.get("escalas", {}).get(escala, {}).get(pagina, {})
+            rss, rss_base = medida["rss_pico_mb"], referencia.get("rss_pico_mb")
+            memoria.append({
+                "escala": int(escala), "pagina": pagina,
+                "rss_inicial_mb": medida["rss_inicial_mb"], "rss_pico_mb": rss, "base_rss_pico_mb": rss_base,
+                "regressao": bool(rss and rss_base and rss > rss_base * (1 + tolerancia)),
+            })
+            for nome, medidas in medida["consultas"].items():
+                p95, p95_base = medidas["p95_ms"], referencia.get("consultas", {}).get(nome, {}).get("p95_ms")
+                tempos.append({
+                    "escala": int(escala), "pagina": pagina, "consulta": nome,
+                    "frio_ms": medidas["frio_ms"], "p50_ms": medidas["p50_ms"], "p95_ms": p95, "base_p95_ms": p95_base,
+                    "regressao": p95_base is not None and p95 > p95_base * (1 + tolerancia) and p95 - p95_base >= min_diferenca_ms,
+                })
+    return pd.DataFrame(tempos), pd.DataFrame(memoria)
+
+def _argumentos():
+    parser = argparse.ArgumentParser(prog="python -m data.benchmark")
+    parser.add_argument("--escalas", type=int, nargs="+", default=list(ESCALAS))
+    parser.add_argument("--repeticoes", type=int, default=REPETICOES)
+    parser.add_argument("--tolerancia", type=float, default=TOLERANCIA)
+    parser.add_argument("--gravar-base", action="store_true", help=f"grava o resultado como base em {BASE_PATH}")
+    # Uso interno: processos filhos de cada escala
+    parser.add_argument("--preparar", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--origem", help=argparse.SUPPRESS)
+    parser.add_argument("--pagina", choices=PAGINAS, help=argparse.SUPPRESS)
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    args = _argumentos()
+
+    if args.preparar:
+        preparar_escala(args.preparar, args.origem)
+        sys.exit(0)
+    if args.pagina:
+        print(json.dumps(medir_pagina(args.pagina, args.repeticoes)))
+        sys.exit(0)
+
+    resultado = executar(args.escalas, args.repeticoes)
+    os.makedirs(BENCHMARK_DIR, exist_ok=True)
+    caminho = os.path.join(BENCHMARK_DIR, f"resultado_{resultado['motor']}_{time.strftime('%Y%m%d_%H%M%S')}.json")
+    with open(caminho, "w", encoding="utf-8") as f:
+        json.dump(resultado, f, indent=2)
+
+    tempos, memoria = comparar(resultado, _ler_base().get(resultado["motor"], {}), args.tolerancia)
+    with pd.option_context("display.max_rows", None, "display.width", 160):
+        print(tempos.round(1).to_string(index=False))
+        print()
+        print(memoria.round(1).to_string(index=False))
+    print(f"\nResultado gravado em {caminho}")
+
+    if args.gravar_base:
+        gravar_base(resultado)
+        print(f"Base do motor '{resultado['motor']}' gravada em {BASE_PATH}")
+    else:
+        regressoes = tempos["regressao"].sum() + memoria["regressao"].sum()
+        if regressoes:
+            print(f"\n{regressoes} regressão(ões) acima de {args.tolerancia:.0%} da base")
+            sys.exit(1)
@@ -0,0 +1,198 @@
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+from data.CriacaoBD import banco_atual
+
+logger = logging.getLogger(__name__)
+
+# Resultados de consultas gravados em Parquet, compartilhados entre reinícios
+# e réplicas que apontem para o mesmo diretório. A geração do banco faz parte
+# da chave, então um novo build invalida o cache sem nenhuma limpeza manual.
+CACHE_DIR = os.environ.get("ANAC_CACHE_DIR", os.path.join("data", "cache"))
+CACHE_MAX_BYTES = int(os.environ.get("ANAC_CACHE_MAX_MB", 256)) * 1024 * 1024
+
+# Texto e parâmetros das consultas já executadas, das mais antigas para as
+# mais recentes, para o aquecimento refazê-las depois de um reinício ou de
+# uma nova carga (data/aquecimento.py)
+REGISTRO_PATH = os.path.join(CACHE_DIR, "consultas.json")
+MAX_REGISTRO = 500
+
+_lock = threading.Lock()
+# ANAC_CACHE_CONSULTAS=0 desliga o cache (medições do data/benchmark.py)
+_estado = {"ativo": os.environ.get("ANAC_CACHE_CONSULTAS", "1") != "0", "bytes": None}
+# Cópia em memória do registro (JSON da entrada -> entrada), lida na primeira
+# gravação; só uma consulta nova reescreve consultas.json
+_registro = {"entradas": None}
+
+# Literais entre aspas simples são preservados na normalização
+_LITERAL = re.compile(r"('(?:[^']|'')*')")
+_COMENTARIO = re.compile(r"--[^\n]*")
+_ESPACOS = re.compile(r"\s+")
+
+def normalizar_sql(query):
+    partes = _LITERAL.split(query)
+    for i in range(0, len(partes), 2):
+        partes[i] = _ESPACOS.sub(" ", _COMENTARIO.sub(" ", partes[i]))
+    return "".join(partes).strip().rstrip(";").strip()
+
+def chave_consulta(query, params, geracao):
+    conteudo = json.dumps([normalizar_sql(query), params], default=str, sort_keys=True)
+    return f"{geracao}-{hashlib.sha256(conteudo.encode('utf-8')).hexdigest()}"
+
+def _caminho(chave):
+    return os.path.join(CACHE_DIR, f"{chave}.parquet")
+
+def ler(query, params, geracao):
+    if geracao is None or not _estado["ativo"]:
+        return None
+    caminho = _caminho(chave_consulta(query, params, geracao))
+    try:
+        df = pd.read_parquet(caminho)
+    except FileNotFoundError:
+        return None
+    except ImportError:
+        _desativar()
+        return None
+    except Exception:
+        # Arquivo truncado ou corrompido: descarta e refaz a consulta
+        logger.warning("Entrada de cache ilegível descartada: %s", caminho, exc_info=True)
+        _remover(caminho)
+        return None
+    try:
+        os.utime(caminho)  # mtime = último acesso, usado na evicção LRU
+    except OSError:
+        pass
+    return df
+
+def ativo():
+    return _estado["ativo"]
+
+def gravar(query, params, geracao, df):
+    if geracao is None or not _estado["ativo"]:
+        return
+    # Consulta que começou antes de uma nova carga ser publicada: o resultado
+    # já nasce velho e a evicção por ela apagaria as entradas da geração nova
+    if geracao != banco_atual()[0]:
+        return
+    caminho = _caminho(chave_consulta(query, params, geracao))
+    temporario = f"{caminho}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        df.to_parquet(temporario, index=False)
+        os.replace(temporario, caminho)
+    except ImportError:
+        _remover(temporario)
+        _desativar()
+        return
+    except Exception:
+        # Tipos que o Parquet não representa, disco cheio...: segue sem cache
+        logger.warning("Resultado não gravado no cache: %s", caminho, exc_info=True)
+        _remover(temporario)
+        return
+    with _lock:
+        if _estado["bytes"] is not None:
+            _estado["bytes"] += os.path.getsize(caminho)
+        if _estado["bytes"] is None or _estado["bytes"] > CACHE_MAX_BYTES:
+            # Relido aqui: outra carga pode ter sido publicada durante a gravação
+            publicada = banco_atual()[0]
+            if publicada == geracao:
+                _estado["bytes"] = _evictar(publicada)
+        _registrar(query, params)
+
+def _ler_registro():
+    try:
+        with open(REGISTRO_PATH, encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return []
+    except (OSError, ValueError):
+        logger.warning("Registro de consultas ilegível descartado: %s", REGISTRO_PATH, exc_info=True)
+        return []
+
+def _registrar(query, params):
+    # Chamado com _lock; o registro é só uma dica para o aquecimento, então
+    # uma escrita perdida entre processos não tem consequência. Consultas
+    # repetidas só sobem na ordem em memória, gravada com a próxima nova.
+    try:
+        # Mesma serialização de chave_consulta, para a consulta refeita cair na mesma chave
+        texto = json.dumps([normalizar_sql(query), list(params or [])], default=str)
+        entradas = _registro["entradas"]
+        if entradas is None:
+            entradas = OrderedDict((json.dumps(e), e) for e in _ler_registro())
+        if texto in entradas:
+            entradas.move_to_end(texto)
+            _registro["entradas"] = entradas
+            return
+        # Junta, como mais antigas, as que outros processos gravaram desde a leitura
+        registro = OrderedDict((json.dumps(e), e) for e in _ler_registro())
+        for chave in entradas:
+            registro.pop(chave, None)
+        registro.update(entradas)
+        registro[texto] = json.loads(texto)
+        while len(registro) > MAX_REGISTRO:
+            registro.popitem(last=False)
+        _registro["entradas"] = registro
+        temporario = f"{REGISTRO_PATH}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temporario, "w", encoding="utf-8") as f:
+            json.dump(list(registro.values()), f, ensure_ascii=False)
+        os.replace(temporario, REGISTRO_PATH)
+    except (OSError, TypeError, ValueError):
+        logger.warning("Consulta não registrada para o aquecimento", exc_info=True)
+
+def consultas_registradas():
+    # (query, params) das consultas registradas, da mais recente para a mais antiga
+    with _lock:
+        registro = _ler_registro()
+    return [(query, params) for query, params in reversed(registro)]
+
+def _evictar(geracao):
+    # geracao: a publicada. Remove primeiro as entradas das outras gerações,
+    # depois as menos usadas até o diretório caber no limite. Retorna o
+    # tamanho final em bytes.
+    entradas = []
+    with os.scandir(CACHE_DIR) as it:
+        for entrada in it:
+            if not entrada.name.endswith(".parquet"):
+                continue
+            try:
+                stat = entrada.stat()
+            except FileNotFoundError:
+                continue  # removida por outro processo
+            if not entrada.name.startswith(f"{geracao}-"):
+                _remover(entrada.path)
+                continue
+            entradas.append((stat.st_mtime_ns, stat.st_size, entrada.path))
+
+    total = sum(tamanho for _, tamanho, _ in entradas)
+    for _, tamanho, caminho in sorted(entradas):
+        if total <= CACHE_MAX_BYTES:
+            break
+        _remover(caminho)
+        total -= tamanho
+    return total
+
+def limpar():
+    with _lock:
+        if os.path.isdir(CACHE_DIR):
+            for nome in os.listdir(CACHE_DIR):
+                _remover(os.path.join(CACHE_DIR, nome))
+        _estado["bytes"] = 0
+        _registro["entradas"] = None
+
+def _remover(caminho):
+    try:
+        os.remove(caminho)
+    except OSError:
+        pass
+
+def _desativar():
+    if _estado["ativo"]:
+        logger.warning("pyarrow/fastparquet não instalado; cache de consultas em disco desativado")
+        _estado["ativo"] = False
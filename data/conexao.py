@@ -0,0 +1,153 @@
+import os
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+import pandas as pd
+
+from data import cache_consultas, instrumentacao
+from data.CriacaoBD import MANIFESTO_PATH, MOTOR_CONSULTAS, banco_atual
+
+if MOTOR_CONSULTAS == "duckdb":
+    from data import motor_duckdb
+
+# PRAGMAs aplicados a toda conexão de leitura. O mmap faz as páginas do
+# banco serem lidas direto do cache do sistema operacional, compartilhado
+# entre todas as conexões (e sessões) do processo.
+PRAGMAS_LEITURA = {
+    "query_only": "ON",
+    "mmap_size": 256 * 1024 * 1024,
+    "cache_size": -64 * 1024,  # 64 MB por conexão
+    "temp_store": "MEMORY",
+}
+
+# Conexões ociosas mantidas no pool; acima disso são fechadas ao devolver
+MAX_CONEXOES_OCIOSAS = 8
+
+# Threads para as consultas independentes de uma página (ler_varios). Cada
+# consulta pega a sua própria conexão do pool, e o sqlite libera o GIL
+# enquanto executa, então elas rodam de fato em paralelo.
+THREADS_CONSULTAS = int(os.environ.get("ANAC_THREADS_CONSULTAS", MAX_CONEXOES_OCIOSAS))
+
+_pool = queue.LifoQueue()
+_executor = ThreadPoolExecutor(max_workers=THREADS_CONSULTAS, thread_name_prefix="consulta")
+
+# Geração publicada, relida só quando o manifesto muda no disco
+_lock_geracao = threading.Lock()
+_geracao = {"mtime": None, "geracao": None, "caminho": None}
+
+class ConexaoLeitura(sqlite3.Connection):
+    geracao = None
+    # Medição da instrução em andamento, preenchida pelos ganchos de trace e
+    # de progresso instalados em _abrir_conexao
+    passos = 0
+    instrucao = None
+
+    def iniciar_medicao(self):
+        self.passos = 0
+        self.instrucao = None
+
+    def _rastrear(self, instrucao):
+        self.instrucao = instrucao
+
+    def _progresso(self):
+        self.passos += instrumentacao.PASSOS_PROGRESSO
+        return 0  # diferente de zero interromperia a consulta
+
+def geracao_atual():
+    try:
+        mtime = os.stat(MANIFESTO_PATH).st_mtime_ns
+    except FileNotFoundError:
+        mtime = None
+    with _lock_geracao:
+        if mtime != _geracao["mtime"]:
+            _geracao["geracao"], _geracao["caminho"] = banco_atual()
+            _geracao["mtime"] = mtime
+        return _geracao["geracao"], _geracao["caminho"]
+
+def _abrir_conexao(geracao, caminho):
+    if caminho is None:
+        raise FileNotFoundError("Nenhum banco publicado; execute criarTable() primeiro")
+    conn = sqlite3.connect(
+        f"file:{caminho}?mode=ro",
+        uri=True,
+        factory=ConexaoLeitura,
+        check_same_thread=False,  # a conexão circula entre threads, mas nunca em duas ao mesmo tempo
+    )
+    for nome, valor in PRAGMAS_LEITURA.items():
+        conn.execute(f"PRAGMA {nome} = {valor}")
+    conn.set_trace_callback(conn._rastrear)
+    conn.set_progress_handler(conn._progresso, instrumentacao.PASSOS_PROGRESSO)
+    conn.geracao = geracao
+    return conn
+
+def obter_conexao():
+    geracao, caminho = geracao_atual()
+    while True:
+        try:
+            conn = _pool.get_nowait()
+        except queue.Empty:
+            return _abrir_conexao(geracao, caminho)
+        if conn.geracao == geracao:
+            return conn
+        # Conexão de uma geração anterior do banco: descarta
+        conn.close()
+
+def devolver_conexao(conn):
+    if conn.geracao != geracao_atual()[0] or _pool.qsize() >= MAX_CONEXOES_OCIOSAS:
+        conn.close()
+        return
+    _pool.put(conn)
+
+@contextmanager
+def conexao():
+    conn = obter_conexao()
+    try:
+        yield conn
+    finally:
+        devolver_conexao(conn)
+
+def ler_sql(query, params=None, origem=None, execucao=None):
+    # origem: (página, seção) de quem pediu a consulta; descoberta pela pilha
+    # quando não informada. execucao: a da thread que chamou, por padrão
+    # (data/instrumentacao.py)
+    origem = origem or instrumentacao.origem_chamada()
+    execucao = execucao or instrumentacao.execucao_atual()
+    inicio = time.perf_counter()
+    # Resultado servido do cache em disco quando a mesma consulta já rodou
+    # nesta geração do banco (em qualquer processo)
+    geracao, caminho = geracao_atual()
+    df = cache_consultas.ler(query, params, geracao)
+    if df is not None:
+        instrumentacao.registrar(query, params, time.perf_counter() - inicio, len(df), origem, cache=True, execucao=execucao)
+        return df
+    passos = instrucao = None
+    if MOTOR_CONSULTAS == "duckdb":
+        df = motor_duckdb.ler_sql(query, params, geracao, caminho)
+    else:
+        with conexao() as conn:
+            conn.iniciar_medicao()
+            df = pd.read_sql_query(query, conn, params=params)
+            geracao, passos, instrucao = conn.geracao, conn.passos, conn.instrucao
+    instrumentacao.registrar(
+        query, params, time.perf_counter() - inicio, len(df), origem, cache=False,
+        motor=MOTOR_CONSULTAS, passos=passos, instrucao=instrucao, execucao=execucao,
+    )
+    cache_consultas.gravar(query, params, geracao, df)
+    return df
+
+def ler_varios(consultas):
+    # consultas: {nome: (query, params)}. Devolve {nome: DataFrame} quando
+    # todas terminarem: o tempo total é o da mais lenta, não a soma.
+    # A origem e a execução são resolvidas aqui, já que a pilha e o contexto
+    # da página não chegam às threads.
+    origem = instrumentacao.origem_chamada()
+    execucao = instrumentacao.execucao_atual()
+    futuros = {
+        nome: _executor.submit(ler_sql, query, params, origem, execucao)
+        for nome, (query, params) in consultas.items()
+    }
+    return {nome: futuro.result() for nome, futuro in futuros.items()}
@@ -0,0 +1,429 @@
+# Esquema do banco voos.db (modelo estrela).
+#
+# voos_fato guarda uma linha por registro do CSV com chaves inteiras para
+# empresa e aeroportos; os textos repetidos ficam nas dimensões. A visão
+# 'voos' remonta as colunas originais, então as consultas das páginas
+# continuam funcionando sem alteração.
+
+# Medidas numéricas do fato (coluna -> tipo), na ordem do CSV
+MEDIDAS = {
+    'passageiros_pagos': 'INTEGER',
+    'passageiros_gratis': 'INTEGER',
+    'carga_paga_kg': 'REAL',
+    'carga_gratis_kg': 'REAL',
+    'correio_kg': 'REAL',
+    'ask': 'REAL',
+    'rpk': 'REAL',
+    'atk': 'REAL',
+    'rtk': 'REAL',
+    'combustivel_litros': 'REAL',
+    'distancia_voada_km': 'REAL',
+    'decolagens': 'INTEGER',
+    'carga_paga_km': 'REAL',
+    'carga_gratis_km': 'REAL',
+    'correio_km': 'REAL',
+    'assentos': 'INTEGER',
+    'payload': 'REAL',
+    'horas_voadas': 'REAL',
+    'bagagem_kg': 'REAL',
+}
+
+# Tabela de carga (temporária) com as colunas do CSV já renomeadas e o
+# nome do arquivo de origem de cada linha
+CREATE_VOOS_CARGA = '''
+CREATE TEMP TABLE voos_carga (
+    arquivo TEXT,
+    empresa_sigla TEXT,
+    empresa_nome TEXT,
+    empresa_nacionalidade TEXT,
+    ano INTEGER,
+    mes INTEGER,
+    origem_sigla TEXT,
+    origem_nome TEXT,
+    origem_pais TEXT,
+    origem_continente TEXT,
+    destino_sigla TEXT,
+    destino_nome TEXT,
+    destino_pais TEXT,
+    destino_continente TEXT,
+    natureza TEXT,
+    grupo_voo TEXT,
+    passageiros_pagos INTEGER,
+    passageiros_gratis INTEGER,
+    carga_paga_kg REAL, -- Alterado para REAL caso haja valores decimais
+    carga_gratis_kg REAL, -- Alterado para REAL
+    correio_kg REAL, -- Alterado para REAL
+    ask REAL, -- ASK, RPK, ATK, RTK geralmente são reais
+    rpk REAL,
+    atk REAL,
+    rtk REAL,
+    combustivel_litros REAL, -- Alterado para REAL
+    distancia_voada_km REAL, -- Alterado para REAL
+    decolagens INTEGER,
+    carga_paga_km REAL, -- Alterado para REAL
+    carga_gratis_km REAL, -- Alterado para REAL
+    correio_km REAL, -- Alterado para REAL
+    assentos INTEGER,
+    payload REAL, -- PAYLOAD geralmente é REAL
+    horas_voadas REAL,
+    bagagem_kg REAL -- BAGAGEM (KG) pode ser real
+)
+'''
+
+# ====================================
+# Dimensões
+# ====================================
+CREATE_DIMENSOES = [
+    '''
+    CREATE TABLE IF NOT EXISTS continentes_dim (
+        id INTEGER PRIMARY KEY,
+        nome TEXT NOT NULL UNIQUE
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS paises_dim (
+        id INTEGER PRIMARY KEY,
+        nome TEXT NOT NULL UNIQUE,
+        continente_id INTEGER REFERENCES continentes_dim (id)
+    )
+    ''',
+    # Apenas os aeroportos que aparecem nos voos, com as coordenadas
+    # resolvidas uma única vez na carga (airportsdata, código ICAO)
+    '''
+    CREATE TABLE IF NOT EXISTS aeroportos_dim (
+        id INTEGER PRIMARY KEY,
+        sigla TEXT NOT NULL UNIQUE,
+        nome TEXT,
+        pais_id INTEGER REFERENCES paises_dim (id),
+        lat REAL,
+        lon REAL,
+        status TEXT -- 'resolvido' ou 'sem_coordenadas'
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS empresas_dim (
+        id INTEGER PRIMARY KEY,
+        sigla TEXT,
+        nome TEXT,
+        nacionalidade TEXT,
+        UNIQUE (sigla, nome, nacionalidade)
+    )
+    ''',
+]
+
+INSERT_CONTINENTES = '''
+INSERT OR IGNORE INTO continentes_dim (nome)
+    SELECT continente FROM (
+        SELECT origem_continente AS continente FROM voos_carga
+        UNION
+        SELECT destino_continente FROM voos_carga
+    )
+    ORDER BY continente
+'''
+
+# Linhas da carga que vão para o fato (partições refeitas, arquivo vencedor).
+# Atributos que mudam nas dimensões vêm só delas: arquivos relidos trazem
+# também meses que não são substituídos.
+LINHAS_CARGA_FATO = '''
+    SELECT v.* FROM voos_carga v
+    JOIN periodos_afetados p ON p.ano = v.ano AND p.mes = v.mes AND p.arquivo = v.arquivo
+'''
+
+# País existente tem o continente atualizado se a fonte mudou. O WHERE true
+# desfaz a ambiguidade entre o ON do JOIN e o ON CONFLICT.
+INSERT_PAISES = f'''
+INSERT INTO paises_dim (nome, continente_id)
+    SELECT p.pais, c.id
+    FROM (
+        SELECT pais, MAX(continente) AS continente
+        FROM (
+            SELECT origem_pais AS pais, origem_continente AS continente FROM ({LINHAS_CARGA_FATO})
+            UNION
+            SELECT destino_pais, destino_continente FROM ({LINHAS_CARGA_FATO})
+        )
+        GROUP BY pais
+    ) p
+    JOIN continentes_dim c ON c.nome = p.continente
+    WHERE true
+    ORDER BY p.pais
+    ON CONFLICT (nome) DO UPDATE SET continente_id = excluded.continente_id
+'''
+
+# Aeroportos da carga (sigla, nome, país, já na dimensão?); as coordenadas
+# dos novos são resolvidas em Python
+SELECT_AEROPORTOS_CARGA = f'''
+SELECT sigla, MAX(nome), MAX(pais), sigla IN (SELECT sigla FROM aeroportos_dim)
+FROM (
+    SELECT origem_sigla AS sigla, origem_nome AS nome, origem_pais AS pais FROM ({LINHAS_CARGA_FATO})
+    UNION ALL
+    SELECT destino_sigla, destino_nome, destino_pais FROM ({LINHAS_CARGA_FATO})
+)
+GROUP BY sigla
+ORDER BY sigla
+'''
+
+# Aeroporto existente tem nome e país atualizados; as coordenadas ficam
+INSERT_AEROPORTO = '''
+INSERT INTO aeroportos_dim (sigla, nome, pais_id, lat, lon, status)
+VALUES (?, ?, (SELECT id FROM paises_dim WHERE nome = ?), ?, ?, ?)
+ON CONFLICT (sigla) DO UPDATE SET nome = excluded.nome, pais_id = excluded.pais_id
+'''
+
+INSERT_EMPRESAS = '''
+INSERT OR IGNORE INTO empresas_dim (sigla, nome, nacionalidade)
+    SELECT DISTINCT empresa_sigla, empresa_nome, empresa_nacionalidade
+    FROM voos_carga
+    ORDER BY empresa_nome
+'''
+
+# ====================================
+# Fato
+# ====================================
+CREATE_VOOS_FATO = f'''
+CREATE TABLE IF NOT EXISTS voos_fato (
+    empresa_id INTEGER NOT NULL REFERENCES empresas_dim (id),
+    ano INTEGER,
+    mes INTEGER,
+    origem_id INTEGER NOT NULL REFERENCES aeroportos_dim (id),
+    destino_id INTEGER NOT NULL REFERENCES aeroportos_dim (id),
+    natureza TEXT,
+    grupo_voo TEXT,
+    {", ".join(f"{m} {tipo}" for m, tipo in MEDIDAS.items())}
+)
+'''
+
+INSERT_VOOS_FATO = f'''
+INSERT INTO voos_fato
+    SELECT
+        e.id, v.ano, v.mes, o.id, d.id, v.natureza, v.grupo_voo,
+        {", ".join(f"v.{m}" for m in MEDIDAS)}
+    FROM voos_carga v
+    JOIN periodos_afetados p ON p.ano = v.ano AND p.mes = v.mes AND p.arquivo = v.arquivo
+    JOIN empresas_dim e
+        ON e.sigla = v.empresa_sigla AND e.nome = v.empresa_nome AND e.nacionalidade = v.empresa_nacionalidade
+    JOIN aeroportos_dim o ON o.sigla = v.origem_sigla
+    JOIN aeroportos_dim d ON d.sigla = v.destino_sigla
+'''
+
+# Partições (ano, mês) substituídas nesta carga e o arquivo que fornece
+# as linhas de cada uma (NULL se a partição deixou de existir)
+CREATE_PERIODOS_AFETADOS = '''
+CREATE TEMP TABLE periodos_afetados (
+    ano INTEGER,
+    mes INTEGER,
+    arquivo TEXT,
+    PRIMARY KEY (ano, mes)
+)
+'''
+
+DELETE_FATO_PERIODOS = '''
+DELETE FROM voos_fato
+WHERE (ano, mes) IN (SELECT ano, mes FROM periodos_afetados)
+'''
+
+# Remove empresas e aeroportos que deixaram de aparecer nos voos e, em
+# seguida, países e continentes que ficaram sem aeroporto
+LIMPAR_DIMENSOES = [
+    '''
+    DELETE FROM aeroportos_dim
+    WHERE id NOT IN (SELECT origem_id FROM voos_fato UNION SELECT destino_id FROM voos_fato)
+    ''',
+    '''
+    DELETE FROM empresas_dim
+    WHERE id NOT IN (SELECT DISTINCT empresa_id FROM voos_fato)
+    ''',
+    '''
+    DELETE FROM paises_dim
+    WHERE id NOT IN (SELECT pais_id FROM aeroportos_dim WHERE pais_id IS NOT NULL)
+    ''',
+    '''
+    DELETE FROM continentes_dim
+    WHERE id NOT IN (SELECT continente_id FROM paises_dim WHERE continente_id IS NOT NULL)
+    ''',
+]
+
+# Visão de compatibilidade com as colunas da antiga tabela voos. CROSS JOIN
+# fixa a ordem no SQLite: o fato é percorrido primeiro e cada dimensão é
+# buscada pela chave primária (as condições ficam no WHERE porque o DuckDB
+# não aceita ON em CROSS JOIN). Com JOIN o planejador chegava a começar por
+# uma dimensão e varrer o fato uma vez por linha dela (segundos a 10×).
+CREATE_VIEW_VOOS = f'''
+CREATE VIEW IF NOT EXISTS voos AS
+    SELECT
+        e.sigla AS empresa_sigla,
+        e.nome AS empresa_nome,
+        e.nacionalidade AS empresa_nacionalidade,
+        f.ano,
+        f.mes,
+        o.sigla AS origem_sigla,
+        o.nome AS origem_nome,
+        op.nome AS origem_pais,
+        oc.nome AS origem_continente,
+        d.sigla AS destino_sigla,
+        d.nome AS destino_nome,
+        dp.nome AS destino_pais,
+        dc.nome AS destino_continente,
+        f.natureza,
+        f.grupo_voo,
+        {", ".join(f"f.{m}" for m in MEDIDAS)}
+    FROM voos_fato f
+    CROSS JOIN empresas_dim e
+    CROSS JOIN aeroportos_dim o
+    CROSS JOIN paises_dim op
+    CROSS JOIN continentes_dim oc
+    CROSS JOIN aeroportos_dim d
+    CROSS JOIN paises_dim dp
+    CROSS JOIN continentes_dim dc
+    WHERE
+        e.id = f.empresa_id
+        AND o.id = f.origem_id AND op.id = o.pais_id AND oc.id = op.continente_id
+        AND d.id = f.destino_id AND dp.id = d.pais_id AND dc.id = dp.continente_id
+'''
+
+# Índices secundários: colunas usadas nos filtros das páginas e índices de
+# cobertura para os GROUP BY mais frequentes. São criados depois da carga
+# em massa, nunca durante.
+INDICES = {
+    'idx_fato_empresa_periodo_horas': ('voos_fato', ('empresa_id', 'ano', 'mes', 'horas_voadas')),
+    'idx_fato_rota': ('voos_fato', ('origem_id', 'destino_id')),
+    'idx_fato_destino': ('voos_fato', ('destino_id',)),
+    'idx_fato_natureza_destino': ('voos_fato', ('natureza', 'destino_id', 'passageiros_pagos')),
+    'idx_fato_periodo': ('voos_fato', ('ano', 'mes')),
+    'idx_resumo_periodo': ('resumo_mensal', ('ano', 'mes')),
+    'idx_empresas_nome': ('empresas_dim', ('nome',)),
+    'idx_aeroportos_pais': ('aeroportos_dim', ('pais_id',)),
+    'idx_paises_continente': ('paises_dim', ('continente_id',)),
+}
+
+# ====================================
+# Agregados e visões das páginas
+# ====================================
+
+# Agregado mensal materializado na carga (mês x empresa x natureza x
+# país/continente de origem e destino). As páginas leem esta tabela
+# pequena em vez de reagregar voos a cada renderização.
+CREATE_RESUMO_MENSAL = '''
+CREATE TABLE IF NOT EXISTS resumo_mensal (
+    ano INTEGER,
+    mes INTEGER,
+    empresa_sigla TEXT,
+    empresa_nome TEXT,
+    natureza TEXT,
+    origem_pais TEXT,
+    origem_continente TEXT,
+    destino_pais TEXT,
+    destino_continente TEXT,
+    grupo_voo TEXT,
+    registros INTEGER,
+    passageiros_pagos INTEGER,
+    passageiros_gratis INTEGER,
+    carga_paga_kg REAL,
+    carga_gratis_kg REAL,
+    correio_kg REAL,
+    ask REAL,
+    rpk REAL,
+    combustivel_litros REAL,
+    distancia_voada_km REAL,
+    decolagens INTEGER,
+    horas_voadas REAL
+)
+'''
+
+DELETE_RESUMO_PERIODOS = '''
+DELETE FROM resumo_mensal
+WHERE (ano, mes) IN (SELECT ano, mes FROM periodos_afetados)
+'''
+
+INSERT_RESUMO_MENSAL = '''
+INSERT INTO resumo_mensal
+    SELECT
+        ano,
+        mes,
+        empresa_sigla,
+        empresa_nome,
+        natureza,
+        origem_pais,
+        origem_continente,
+        destino_pais,
+        destino_continente,
+        grupo_voo,
+        COUNT(*) AS registros,
+        SUM(passageiros_pagos) AS passageiros_pagos,
+        SUM(passageiros_gratis) AS passageiros_gratis,
+        SUM(carga_paga_kg) AS carga_paga_kg,
+        SUM(carga_gratis_kg) AS carga_gratis_kg,
+        SUM(correio_kg) AS correio_kg,
+        SUM(ask) AS ask,
+        SUM(rpk) AS rpk,
+        SUM(combustivel_litros) AS combustivel_litros,
+        SUM(distancia_voada_km) AS distancia_voada_km,
+        SUM(decolagens) AS decolagens,
+        SUM(horas_voadas) AS horas_voadas
+    FROM voos
+    WHERE (ano, mes) IN (SELECT ano, mes FROM periodos_afetados)
+    GROUP BY
+        ano, mes, empresa_sigla, empresa_nome, natureza,
+        origem_pais, origem_continente, destino_pais, destino_continente, grupo_voo
+'''
+
+# Números principais das páginas: expressões sobre resumo_mensal usadas
+# tanto na tabela kpis_gerais (sem filtros, gravada na carga) quanto nas
+# consultas filtradas de data/kpis.py, numa única passada pela tabela
+EXPRESSOES_KPIS = {
+    'registros': 'SUM(registros)',
+    'total_empresas': 'COUNT(DISTINCT empresa_nome)',
+    'passageiros_pagos': 'SUM(passageiros_pagos)',
+    'passageiros_gratis': 'SUM(passageiros_gratis)',
+    'carga_kg': 'SUM(carga_paga_kg + carga_gratis_kg)',
+    'correio_kg': 'SUM(correio_kg)',
+    'decolagens': 'SUM(decolagens)',
+    'distancia_km': 'SUM(distancia_voada_km)',
+    'ask': 'SUM(ask)',
+    'rpk': 'SUM(rpk)',
+    'combustivel_litros': 'SUM(combustivel_litros)',
+}
+
+CREATE_KPIS_GERAIS = '''
+CREATE TABLE IF NOT EXISTS kpis_gerais (
+    total_aeroportos INTEGER,
+    registros INTEGER,
+    total_empresas INTEGER,
+    passageiros_pagos INTEGER,
+    passageiros_gratis INTEGER,
+    carga_kg REAL,
+    correio_kg REAL,
+    decolagens INTEGER,
+    distancia_km REAL,
+    ask REAL,
+    rpk REAL,
+    combustivel_litros REAL
+)
+'''
+
+# Recalculada inteira a cada carga (resumo_mensal é pequena). A dimensão de
+# aeroportos só guarda os que aparecem nos voos, então a contagem dela é a
+# de aeroportos distintos.
+INSERT_KPIS_GERAIS = f'''
+INSERT INTO kpis_gerais
+    SELECT
+        (SELECT COUNT(*) FROM aeroportos_dim),
+        {", ".join(EXPRESSOES_KPIS.values())}
+    FROM resumo_mensal
+'''
+
+# Rotas únicas com nomes, usada pelo mapa do dashboard. Criada na carga
+# porque as páginas só abrem o banco em modo somente leitura.
+CREATE_VIEW_AEROPORTOS = '''
+CREATE VIEW IF NOT EXISTS aeroportos AS
+    SELECT DISTINCT
+        o.sigla AS origem_sigla,
+        d.sigla AS destino_sigla,
+        o.nome AS origem_nome,
+        d.nome AS destino_nome
+    FROM
+        (SELECT DISTINCT origem_id, destino_id FROM voos_fato) r
+        JOIN aeroportos_dim o ON o.id = r.origem_id
+        JOIN aeroportos_dim d ON d.id = r.destino_id
+    WHERE
+        o.sigla != '' AND d.sigla != '' AND o.nome != '' AND d.nome != ''
+'''
@@ -0,0 +1,94 @@
+from dataclasses import dataclass
+
+from data.conexao import ler_sql
+
+# Filtros globais escolhidos na barra lateral (main.py) e guardados em
+# st.session_state["filtros"]. Todas as colunas filtradas existem tanto na
+# visão 'voos' quanto em 'resumo_mensal', e ano/mês usam os índices de período.
+
+@dataclass(frozen=True)
+class Filtros:
+    anos: tuple[int, int] | None = None   # (inicial, final), inclusivo
+    meses: tuple[int, int] | None = None  # mês do ano, (inicial, final)
+    empresas: tuple[str, ...] = ()
+    natureza: str | None = None
+    grupo_voo: str | None = None
+    origem_pais: str | None = None
+    destino_pais: str | None = None
+
+    @property
+    def ativos(self):
+        return any((self.anos, self.meses, self.empresas, self.natureza,
+                    self.grupo_voo, self.origem_pais, self.destino_pais))
+
+SEM_FILTROS = Filtros()
+
+def clausula(filtros, inicio="WHERE", prefixo=""):
+    # Monta o trecho SQL e os parâmetros dos filtros. Com inicio="AND" o
+    # trecho é concatenado a um WHERE já existente. Sem filtros: ("", []).
+    condicoes, params = [], []
+    if filtros.anos:
+        condicoes.append(f"{prefixo}ano BETWEEN ? AND ?")
+        params += filtros.anos
+    if filtros.meses:
+        condicoes.append(f"{prefixo}mes BETWEEN ? AND ?")
+        params += filtros.meses
+    if filtros.empresas:
+        condicoes.append(f"{prefixo}empresa_nome IN ({', '.join('?' * len(filtros.empresas))})")
+        params += filtros.empresas
+    for coluna in ("natureza", "grupo_voo", "origem_pais", "destino_pais"):
+        valor = getattr(filtros, coluna)
+        if valor is not None:
+            condicoes.append(f"{prefixo}{coluna} = ?")
+            params.append(valor)
+    if not condicoes:
+        return "", []
+    return f"{inicio} " + " AND ".join(condicoes), params
+
+def clausula_fato(filtros, inicio="WHERE", prefixo=""):
+    # Como clausula(), mas sobre as chaves de voos_fato: empresa e países
+    # viram subconsultas nas dimensões, sem passar pela visão 'voos'
+    condicoes, params = [], []
+    if filtros.anos:
+        condicoes.append(f"{prefixo}ano BETWEEN ? AND ?")
+        params += filtros.anos
+    if filtros.meses:
+        condicoes.append(f"{prefixo}mes BETWEEN ? AND ?")
+        params += filtros.meses
+    if filtros.empresas:
+        condicoes.append(
+            f"{prefixo}empresa_id IN (SELECT id FROM empresas_dim "
+            f"WHERE nome IN ({', '.join('?' * len(filtros.empresas))}))"
+        )
+        params += filtros.empresas
+    for coluna in ("natureza", "grupo_voo"):
+        valor = getattr(filtros, coluna)
+        if valor is not None:
+            condicoes.append(f"{prefixo}{coluna} = ?")
+            params.append(valor)
+    for lado in ("origem", "destino"):
+        valor = getattr(filtros, f"{lado}_pais")
+        if valor is not None:
+            condicoes.append(
+                f"{prefixo}{lado}_id IN (SELECT a.id FROM aeroportos_dim a "
+                f"JOIN paises_dim p ON p.id = a.pais_id WHERE p.nome = ?)"
+            )
+            params.append(valor)
+    if not condicoes:
+        return "", []
+    return f"{inicio} " + " AND ".join(condicoes), params
+
+def carregar_opcoes():
+    # Valores disponíveis para os filtros (sem filtro nenhum aplicado)
+    def distintos(coluna):
+        df = ler_sql(f"SELECT DISTINCT {coluna} FROM resumo_mensal WHERE {coluna} IS NOT NULL ORDER BY {coluna}")
+        return df[coluna].tolist()
+
+    return {
+        "anos": [int(ano) for ano in distintos("ano")],
+        "empresas": distintos("empresa_nome"),
+        "naturezas": distintos("natureza"),
+        "grupos_voo": distintos("grupo_voo"),
+        "origem_paises": distintos("origem_pais"),
+        "destino_paises": distintos("destino_pais"),
+    }
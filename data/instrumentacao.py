@@ -0,0 +1,145 @@
+import contextvars
+import logging
+import logging.handlers
+import os
+import sys
+import threading
+import time
+from collections import deque
+
+import pandas as pd
+
+from data.cache_consultas import normalizar_sql
+
+# Medição das consultas das páginas. Toda chamada a ler_sql (data/conexao.py)
+# é registrada aqui com o SQL normalizado, os parâmetros, o tempo, as linhas
+# devolvidas, se veio do cache e de qual página/seção partiu. No SQLite os
+# ganchos de trace e de progresso da conexão completam a medição com a
+# instrução expandida e os passos da máquina virtual. As consultas acima do
+# limiar vão para um log rotativo; os agregados ficam em memória.
+
+LIMIAR_LENTA_MS = float(os.environ.get("ANAC_LIMIAR_LENTA_MS", 250))
+LOG_LENTAS_PATH = os.environ.get("ANAC_LOG_LENTAS", os.path.join("data", "logs", "consultas_lentas.log"))
+LOG_LENTAS_MAX_BYTES = 1024 * 1024
+LOG_LENTAS_ARQUIVOS = 3
+
+# Execuções individuais mantidas em memória (as mais antigas saem primeiro)
+MAX_RECENTES = 500
+
+# Intervalo do gancho de progresso do SQLite, em instruções da máquina virtual
+PASSOS_PROGRESSO = 1000
+
+# Páginas e as suas consultas (data/paginas/<pagina>.py)
+DIRETORIO_PAGINAS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "frontend")
+DIRETORIO_CONSULTAS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "paginas")
+
+logger = logging.getLogger(__name__)
+_logger_lentas = logging.getLogger(f"{__name__}.lentas")
+_logger_lentas.propagate = False
+
+_lock = threading.Lock()
+_agregados = {}
+_recentes = deque(maxlen=MAX_RECENTES)
+
+# Execução da página (ou reexecução de fragmento) que está rodando nesta
+# thread, definida por frontend/diagnostico.py; o aquecimento e as threads
+# de consulta não a herdam, e ler_varios a repassa explicitamente
+_execucao = contextvars.ContextVar("execucao", default=None)
+
+def definir_execucao(identificador):
+    return _execucao.set(identificador)
+
+def restaurar_execucao(token):
+    _execucao.reset(token)
+
+def execucao_atual():
+    return _execucao.get()
+
+def origem_chamada():
+    # Primeiro quadro da pilha dentro de frontend/ ou data/paginas/: a página
+    # é o arquivo e a seção é a função (loader ou fragmento); código solto da
+    # página é 'pagina'
+    quadro = sys._getframe(1)
+    while quadro is not None:
+        arquivo = quadro.f_code.co_filename
+        if os.path.dirname(os.path.abspath(arquivo)) in (DIRETORIO_CONSULTAS, DIRETORIO_PAGINAS):
+            secao = quadro.f_code.co_name
+            return os.path.splitext(os.path.basename(arquivo))[0], "pagina" if secao == "<module>" else secao
+        quadro = quadro.f_back
+    return None, None
+
+def registrar(query, params, segundos, linhas, origem, cache, motor=None, passos=None, instrucao=None, execucao=None):
+    sql = normalizar_sql(query)
+    pagina, secao = origem
+    execucao = {
+        "instante": time.time(),
+        "sql": sql,
+        "params": list(params or []),
+        "ms": segundos * 1000,
+        "linhas": linhas,
+        "pagina": pagina,
+        "secao": secao,
+        "execucao": execucao or _execucao.get(),
+        "cache": cache,
+        "motor": motor,
+        "passos_vm": passos,
+    }
+    with _lock:
+        _recentes.append(execucao)
+        agregado = _agregados.setdefault(sql, {
+            "sql": sql, "chamadas": 0, "acertos_cache": 0, "total_ms": 0.0,
+            "max_ms": 0.0, "linhas": 0, "passos_vm": 0, "lentas": 0, "origens": set(),
+        })
+        agregado["chamadas"] += 1
+        agregado["acertos_cache"] += cache
+        agregado["total_ms"] += execucao["ms"]
+        agregado["max_ms"] = max(agregado["max_ms"], execucao["ms"])
+        agregado["linhas"] += linhas
+        agregado["passos_vm"] += passos or 0
+        agregado["origens"].add(f"{pagina}:{secao}" if pagina else "-")
+        lenta = execucao["ms"] >= LIMIAR_LENTA_MS
+        agregado["lentas"] += lenta
+    if lenta:
+        _registrar_lenta(execucao, instrucao)
+
+def _registrar_lenta(execucao, instrucao):
+    if not _logger_lentas.handlers:
+        with _lock:
+            if not _logger_lentas.handlers:
+                try:
+                    os.makedirs(os.path.dirname(LOG_LENTAS_PATH) or ".", exist_ok=True)
+                    handler = logging.handlers.RotatingFileHandler(
+                        LOG_LENTAS_PATH, maxBytes=LOG_LENTAS_MAX_BYTES,
+                        backupCount=LOG_LENTAS_ARQUIVOS, encoding="utf-8",
+                    )
+                except OSError:
+                    logger.warning("Log de consultas lentas indisponível: %s", LOG_LENTAS_PATH, exc_info=True)
+                    handler = logging.NullHandler()
+                handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+                _logger_lentas.addHandler(handler)
+                _logger_lentas.setLevel(logging.INFO)
+    # A instrução expandida pelo SQLite já traz os parâmetros no texto
+    _logger_lentas.info(
+        "%.1f ms | %d linhas | %s passos | %s:%s | %s | %s",
+        execucao["ms"], execucao["linhas"], execucao["passos_vm"] if execucao["passos_vm"] is not None else "-",
+        execucao["pagina"] or "-", execucao["secao"] or "-", execucao["motor"] or "cache",
+        normalizar_sql(instrucao) if instrucao else f"{execucao['sql']} {execucao['params']}",
+    )
+
+def estatisticas():
+    # Agregados por SQL normalizado, das consultas que mais custaram no total
+    with _lock:
+        linhas = [dict(a, origens=", ".join(sorted(a["origens"]))) for a in _agregados.values()]
+    colunas = ["sql", "chamadas", "acertos_cache", "total_ms", "max_ms", "linhas", "passos_vm", "lentas", "origens"]
+    df = pd.DataFrame(linhas, columns=colunas)
+    df.insert(4, "medio_ms", df["total_ms"] / df["chamadas"])
+    return df.sort_values("total_ms", ascending=False, ignore_index=True)
+
+def execucoes_recentes():
+    with _lock:
+        return list(_recentes)
+
+def limpar():
+    with _lock:
+        _agregados.clear()
+        _recentes.clear()
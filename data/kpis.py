@@ -0,0 +1,88 @@
+from dataclasses import dataclass, fields
+from functools import lru_cache
+
+import pandas as pd
+
+from data.conexao import geracao_atual, ler_sql
+from data.esquema import EXPRESSOES_KPIS
+from data.filtros import clausula, clausula_fato
+
+# Números principais compartilhados pelas páginas. Sem filtros vêm da tabela
+# kpis_gerais gravada na carga; com filtros, de uma única consulta sobre
+# resumo_mensal (mais a contagem de aeroportos, feita sobre voos_fato).
+
+@dataclass(frozen=True)
+class Kpis:
+    total_aeroportos: int
+    registros: int
+    total_empresas: int
+    passageiros_pagos: int
+    passageiros_gratis: int
+    carga_kg: float
+    correio_kg: float
+    decolagens: int
+    distancia_km: float
+    ask: float
+    rpk: float
+    combustivel_litros: float
+
+    @property
+    def vazio(self):
+        return self.registros == 0
+
+    @property
+    def total_passageiros(self):
+        return self.passageiros_pagos + self.passageiros_gratis
+
+    @property
+    def taxa_ocupacao(self):
+        return self.rpk / self.ask if self.ask else 0.0
+
+    @property
+    def litros_por_km(self):
+        return self.combustivel_litros / self.distancia_km if self.distancia_km else 0.0
+
+    @property
+    def passageiros_por_litro(self):
+        return self.total_passageiros / self.combustivel_litros if self.combustivel_litros else 0.0
+
+    @property
+    def consumo_medio(self):
+        # Litros por registro (linha do CSV)
+        return self.combustivel_litros / self.registros if self.registros else 0.0
+
+def _consulta(filtros):
+    if not filtros.ativos:
+        return "SELECT * FROM kpis_gerais", []
+    where, params = clausula(filtros)
+    # Aeroportos distintos direto das chaves do fato, sem a visão 'voos'
+    where_fato, params_fato = clausula_fato(filtros)
+    query = f"""
+    SELECT
+        (SELECT COUNT(*) FROM (
+            SELECT origem_id FROM voos_fato {where_fato}
+            UNION
+            SELECT destino_id FROM voos_fato {where_fato}
+        )) AS total_aeroportos,
+        {", ".join(f"{expressao} AS {nome}" for nome, expressao in EXPRESSOES_KPIS.items())}
+    FROM resumo_mensal
+    {where}
+    """
+    return query, [*params_fato, *params_fato, *params]
+
+@lru_cache(maxsize=64)
+def _calcular(geracao, filtros):
+    query, params = _consulta(filtros)
+    df = ler_sql(query, params=params)
+    linha = df.iloc[0] if not df.empty else {}
+    # Sem linhas para os filtros as somas vêm nulas: o registro fica zerado
+    valores = {}
+    for campo in fields(Kpis):
+        valor = linha.get(campo.name)
+        valor = 0 if valor is None or pd.isna(valor) else valor
+        valores[campo.name] = int(valor) if campo.type is int else float(valor)
+    return Kpis(**valores)
+
+def carregar_kpis(filtros):
+    # A geração entra na chave para o cache acompanhar novas cargas
+    return _calcular(geracao_atual()[0], filtros)
@@ -0,0 +1,44 @@
+import copy
+import threading
+from collections import OrderedDict
+
+from data.conexao import geracao_atual
+
+# Resultados dos loaders de data/paginas/ em memória, compartilhados por
+# todas as sessões do processo. A geração do banco entra na chave (como em
+# data/kpis.py), então uma nova carga chega às páginas sem reiniciar nada;
+# as entradas da geração anterior saem pelo LRU. O aquecimento
+# (data/aquecimento.py) preenche as mesmas entradas que as páginas leem.
+
+# Entradas mantidas (as menos usadas saem primeiro)
+MAX_ENTRADAS = 256
+
+_lock = threading.Lock()
+_entradas = OrderedDict()
+
+def carregar(funcao, *args):
+    # Argumentos só posicionais e hasheáveis (Filtros, str, int, tuplas)
+    chave = (funcao.__module__, funcao.__qualname__, geracao_atual()[0], args)
+    with _lock:
+        if chave in _entradas:
+            _entradas.move_to_end(chave)
+            valor = _entradas[chave]
+            # Cópia: as páginas acrescentam colunas aos DataFrames recebidos
+            return copy.deepcopy(valor)
+    valor = funcao(*args)
+    with _lock:
+        _entradas[chave] = valor
+        while len(_entradas) > MAX_ENTRADAS:
+            _entradas.popitem(last=False)
+    return copy.deepcopy(valor)
+
+def memorizado(funcao):
+    # Versão de `funcao` que passa por carregar(); usada no topo das páginas
+    def carregar_memorizado(*args):
+        return carregar(funcao, *args)
+    carregar_memorizado.__name__ = funcao.__name__
+    return carregar_memorizado
+
+def limpar():
+    with _lock:
+        _entradas.clear()
@@ -0,0 +1,47 @@
+import os
+import threading
+
+import duckdb
+
+from data import esquema
+from data.CriacaoBD import TABELAS_PARQUET, exportar_parquet
+
+# Motor colunar alternativo: DuckDB em memória com visões sobre os arquivos
+# Parquet da geração publicada. As visões 'voos' e 'aeroportos' são as
+# mesmas do SQLite, então as consultas das páginas rodam sem alteração.
+
+_lock = threading.Lock()
+_base = {"geracao": None, "conn": None}
+
+def _abrir_base(geracao, caminho):
+    # Exporta na hora se a geração foi publicada com o motor sqlite
+    diretorio = exportar_parquet(geracao, caminho)
+    conn = duckdb.connect(":memory:")
+    for tabela in TABELAS_PARQUET:
+        arquivo = os.path.abspath(os.path.join(diretorio, f"{tabela}.parquet")).replace("'", "''")
+        conn.execute(f"CREATE VIEW {tabela} AS SELECT * FROM read_parquet('{arquivo}')")
+    conn.execute(esquema.CREATE_VIEW_VOOS)
+    conn.execute(esquema.CREATE_VIEW_AEROPORTOS)
+    return conn
+
+def ler_sql(query, params, geracao, caminho):
+    if caminho is None:
+        raise FileNotFoundError("Nenhum banco publicado; execute criarTable() primeiro")
+    with _lock:
+        if _base["geracao"] != geracao:
+            # A base anterior é liberada quando a última consulta nela terminar
+            _base["conn"] = _abrir_base(geracao, caminho)
+            _base["geracao"] = geracao
+        # Um cursor por consulta: conexões DuckDB não são compartilháveis entre threads
+        cursor = _base["conn"].cursor()
+    try:
+        resultado = cursor.execute(query, params or [])
+        df = resultado.df()
+        # SUM de inteiros vira HUGEINT no DuckDB (float64 no pandas); o
+        # SQLite devolve int64, que é o que as páginas esperam
+        for nome, tipo, *_ in resultado.description:
+            if str(tipo) == "HUGEINT" and df[nome].notna().all():
+                df[nome] = df[nome].astype("int64")
+        return df
+    finally:
+        cursor.close()
@@ -0,0 +1,183 @@
+from data.conexao import ler_sql, ler_varios
+from data.filtros import SEM_FILTROS, clausula, clausula_fato
+
+# Consultas da página frontend/aeroportos.py. Os KPIs vêm de data/kpis.py.
+# Listas e séries mensais saem de resumo_mensal; o que precisa de aeroporto
+# ou de produtos linha a linha lê voos_fato pelas chaves, e só junta as
+# dimensões depois de filtrar.
+
+# Chaves dos aeroportos de um país / continente
+AEROPORTOS_DO_PAIS = '''
+    SELECT a.id FROM aeroportos_dim a
+    JOIN paises_dim p ON p.id = a.pais_id
+    WHERE p.nome = ?
+'''
+AEROPORTOS_DO_CONTINENTE = '''
+    SELECT a.id FROM aeroportos_dim a
+    JOIN paises_dim p ON p.id = a.pais_id
+    JOIN continentes_dim c ON c.id = p.continente_id
+    WHERE c.nome = ?
+'''
+
+def _consulta_top10(coluna, alias, tipo, filtros):
+    e_filtros, params = clausula(filtros, "AND")
+    return f"""
+    SELECT {coluna} AS {alias},
+        SUM(passageiros_pagos) AS Total_Passageiros,
+        '{tipo}' AS Tipo
+    FROM resumo_mensal
+    WHERE {coluna} IS NOT NULL {e_filtros}
+    GROUP BY {coluna}
+    ORDER BY Total_Passageiros DESC
+    LIMIT 10;
+    """, params
+
+def carregar_top10(filtros=SEM_FILTROS):
+    # Os quatro Top-10 (continentes e países, origem e destino) são
+    # consultas independentes: rodam em paralelo
+    return ler_varios({
+        "continente_destino": _consulta_top10("destino_continente", "Continente", "Destino", filtros),
+        "continente_origem": _consulta_top10("origem_continente", "Continente", "Origem", filtros),
+        "pais_destino": _consulta_top10("destino_pais", "Pais", "Destino", filtros),
+        "pais_origem": _consulta_top10("origem_pais", "Pais", "Origem", filtros),
+    })
+
+def carregar_naturezas():
+    return ler_sql("SELECT DISTINCT natureza FROM resumo_mensal ORDER BY natureza")['natureza'].dropna().tolist()
+
+def carregar_destinos(natureza="Todas", filtros=SEM_FILTROS):
+    where, params = clausula_fato(filtros)
+    params = list(params)
+    if natureza != "Todas":
+        where += " AND natureza = ?" if where else "WHERE natureza = ?"
+        params.append(natureza)
+    # Soma por chave de destino (idx_fato_natureza_destino) e só então os nomes
+    query = f"""
+    SELECT
+        d.sigla AS destino_sigla,
+        d.nome AS destino_nome,
+        t.total AS Total_Passageiros_Destino
+    FROM (
+        SELECT destino_id, SUM(passageiros_pagos) AS total
+        FROM voos_fato
+        {where}
+        GROUP BY destino_id
+    ) t
+    JOIN aeroportos_dim d ON d.id = t.destino_id
+    WHERE
+        d.nome IS NOT NULL
+    ORDER BY
+        Total_Passageiros_Destino DESC
+    LIMIT 11;
+    """
+    return ler_sql(query, params=params)
+
+def carregar_continentes():
+    return ler_sql("SELECT DISTINCT destino_continente FROM resumo_mensal WHERE destino_continente IS NOT NULL ORDER BY destino_continente")['destino_continente'].tolist()
+
+def carregar_kpis_continente(continente, filtros=SEM_FILTROS):
+    e_filtros, params = clausula_fato(filtros, "AND")
+    query = f"""
+    SELECT
+        SUM(passageiros_pagos + passageiros_gratis) AS Total_Passageiros_Continente,
+        SUM(decolagens) AS Total_Decolagens_Continente,
+        SUM(passageiros_pagos * distancia_voada_km) AS Total_RPK_Continente,
+        SUM(assentos * distancia_voada_km) AS Total_ASK_Continente
+    FROM voos_fato
+    WHERE destino_id IN ({AEROPORTOS_DO_CONTINENTE}) {e_filtros};
+    """
+    return ler_sql(query, params=(continente, *params)).fillna(0).iloc[0]
+
+def carregar_decolagens_continente(continente, filtros=SEM_FILTROS):
+    e_filtros, params = clausula(filtros, "AND")
+    query = f"""
+    SELECT
+        ano,
+        mes,
+        SUM(decolagens) AS Total_Decolagens
+    FROM
+        resumo_mensal
+    WHERE
+        (destino_continente = ? OR origem_continente = ?) {e_filtros}
+    GROUP BY
+        ano, mes
+    ORDER BY
+        ano ASC, mes ASC;
+    """
+    return ler_sql(query, params=(continente, continente, *params))
+
+def carregar_paises():
+    return ler_sql("SELECT DISTINCT destino_pais FROM resumo_mensal WHERE destino_pais IS NOT NULL ORDER BY destino_pais")['destino_pais'].tolist()
+
+def carregar_kpis_pais(pais, filtros=SEM_FILTROS):
+    e_filtros, params = clausula_fato(filtros, "AND")
+    query = f"""
+    SELECT
+        SUM(passageiros_pagos + passageiros_gratis) AS Total_Passageiros_Pais,
+        SUM(decolagens) AS Total_Decolagens_Pais,
+        SUM(passageiros_pagos * distancia_voada_km) AS Total_RPK_Pais,
+        SUM(assentos * distancia_voada_km) AS Total_ASK_Pais
+    FROM voos_fato
+    WHERE destino_id IN ({AEROPORTOS_DO_PAIS}) {e_filtros};
+    """
+    return ler_sql(query, params=(pais, *params)).fillna(0).iloc[0]
+
+def carregar_decolagens_pais(pais, filtros=SEM_FILTROS):
+    e_filtros, params = clausula(filtros, "AND")
+    query = f"""
+    SELECT
+        ano,
+        mes,
+        SUM(decolagens) AS Total_Decolagens_pais
+    FROM
+        resumo_mensal
+    WHERE
+        (destino_pais = ? OR origem_pais = ?) {e_filtros}
+    GROUP BY
+        ano, mes
+    ORDER BY
+        ano ASC, mes ASC;
+    """
+    return ler_sql(query, params=(pais, pais, *params))
+
+def carregar_aeroportos_pais(pais):
+    # A dimensão só guarda aeroportos que aparecem nos voos
+    query = """
+        SELECT a.sigla, a.nome
+        FROM aeroportos_dim a
+        JOIN paises_dim p ON p.id = a.pais_id
+        WHERE p.nome = ?
+        ORDER BY 1
+    """
+    aeroportos = ler_sql(query, params=(pais,)).itertuples(index=False)
+    return [f"{a[0]} - {a[1]}" for a in aeroportos if a[0] is not None and a[1] is not None]
+
+def carregar_voos_aeroporto(sigla, filtros=SEM_FILTROS):
+    # Linhas do fato pelos índices de origem e de destino; só as colunas
+    # exibidas na tabela da página
+    e_filtros, params = clausula_fato(filtros, "AND", prefixo="f.")
+    query = f"""
+        SELECT
+            e.nome AS empresa_nome,
+            o.sigla AS origem_sigla,
+            o.nome AS origem_nome,
+            op.nome AS origem_pais,
+            d.sigla AS destino_sigla,
+            d.nome AS destino_nome,
+            dp.nome AS destino_pais,
+            f.passageiros_pagos,
+            f.distancia_voada_km,
+            f.decolagens,
+            f.horas_voadas
+        FROM voos_fato f
+        JOIN empresas_dim e ON e.id = f.empresa_id
+        JOIN aeroportos_dim o ON o.id = f.origem_id
+        JOIN paises_dim op ON op.id = o.pais_id
+        JOIN aeroportos_dim d ON d.id = f.destino_id
+        JOIN paises_dim dp ON dp.id = d.pais_id
+        WHERE (
+            f.origem_id = (SELECT id FROM aeroportos_dim WHERE sigla = ?)
+            OR f.destino_id = (SELECT id FROM aeroportos_dim WHERE sigla = ?)
+        ) {e_filtros}
+    """
+    return ler_sql(query, params=(sigla, sigla, *params))
@@ -0,0 +1,96 @@
+from data.conexao import ler_sql, ler_varios
+from data.filtros import SEM_FILTROS, clausula
+
+# Consultas da página frontend/dashboard.py. Os KPIs vêm de data/kpis.py.
+
+def tabela_rotas(filtros=SEM_FILTROS):
+    # Rotas únicas com nomes: visão 'aeroportos' criada na carga (data/CriacaoBD.py).
+    # Com filtros ativos, as rotas saem dos voos filtrados, com as mesmas colunas.
+    if not filtros.ativos:
+        return "aeroportos", ()
+    e_filtros, params = clausula(filtros, "AND")
+    rotas = f"""(
+        SELECT DISTINCT origem_sigla, destino_sigla, origem_nome, destino_nome
+        FROM voos
+        WHERE origem_sigla != '' AND destino_sigla != '' AND origem_nome != '' AND destino_nome != '' {e_filtros}
+    ) AS aeroportos"""
+    return rotas, tuple(params)
+
+def carregar_nomes_aeroportos(filtros=SEM_FILTROS):
+    rotas, params = tabela_rotas(filtros)
+    return ler_sql(f'''
+        SELECT DISTINCT origem_nome FROM {rotas}
+        UNION
+        SELECT DISTINCT destino_nome FROM {rotas}
+        ORDER BY origem_nome
+    ''', params=params * 2)['origem_nome'].tolist()
+
+def carregar_destinos(origem, filtros=SEM_FILTROS):
+    rotas, params = tabela_rotas(filtros)
+    return ler_sql(f'''
+        SELECT DISTINCT destino_nome
+        FROM {rotas}
+        WHERE origem_nome = ?
+        ORDER BY destino_nome
+    ''', params=(*params, origem))['destino_nome'].tolist()
+
+def carregar_mapa(origem="Todos", destino="Todos", filtros=SEM_FILTROS):
+    rotas, params = tabela_rotas(filtros)
+    if origem == "Todos":
+        # Mostrar todas as rotas
+        consulta_rotas = (f'''
+            SELECT origem_sigla, destino_sigla
+            FROM {rotas}
+        ''', params)
+
+    elif destino == "Todos":
+        # Mostrar todos os destinos da origem selecionada
+        consulta_rotas = (f'''
+            SELECT origem_sigla, destino_sigla
+            FROM {rotas}
+            WHERE origem_nome = ?
+        ''', (*params, origem))
+
+    else:
+        # Mostrar rota específica
+        consulta_rotas = (f'''
+            SELECT origem_sigla, destino_sigla
+            FROM {rotas}
+            WHERE origem_nome = ? AND destino_nome = ?
+        ''', (*params, origem, destino))
+
+    # Rotas, coordenadas e nomes dos aeroportos são independentes: rodam em paralelo
+    return ler_varios({
+        "rotas": consulta_rotas,
+        # Coordenadas resolvidas na carga (aeroportos_dim), indexadas pelo código ICAO
+        "coords": ("SELECT sigla, lat, lon FROM aeroportos_dim WHERE status = 'resolvido'", None),
+        "nomes": ("SELECT origem_sigla, origem_nome FROM aeroportos", None),
+    })
+
+def _mensal(expressao, alias, filtros):
+    where, params = clausula(filtros)
+    return ler_sql(f'''
+        SELECT
+            mes,
+            SUM({expressao}) AS {alias}
+        FROM
+            resumo_mensal
+        {where}
+        GROUP BY
+            mes
+        ORDER BY
+            mes
+    ''', params=params)
+
+def carregar_passageiros_mes(filtros=SEM_FILTROS):
+    return _mensal("passageiros_pagos + passageiros_gratis", "total_passageiros", filtros)
+
+def carregar_carga_mes(filtros=SEM_FILTROS):
+    return _mensal("carga_paga_kg", "total_carga", filtros)
+
+def carregar_correio_mes(filtros=SEM_FILTROS):
+    return _mensal("correio_kg", "total_correio", filtros)
+
+def carregar_naturezas(filtros=SEM_FILTROS):
+    where, params = clausula(filtros)
+    return ler_sql(f'SELECT natureza, SUM(registros) AS total_voos FROM resumo_mensal {where} GROUP BY natureza', params=params)
@@ -0,0 +1,60 @@
+from data.conexao import ler_sql
+from data.filtros import SEM_FILTROS, clausula
+
+# Consultas da página frontend/eficiencia.py (agregações feitas no banco).
+# Os KPIs vêm de data/kpis.py.
+
+def carregar_eficiencia_mensal(filtros=SEM_FILTROS):
+    where, params = clausula(filtros)
+    query = f"""
+    SELECT
+        ano || '-' || printf('%02d', mes) AS ano_mes,
+        SUM(combustivel_litros) AS combustivel_total,
+        SUM(passageiros_pagos) AS passageiros_total, -- Considera apenas passageiros pagos para esta análise
+        SUM(distancia_voada_km) AS distancia_total
+    FROM resumo_mensal
+    {where}
+    GROUP BY ano, mes
+    ORDER BY ano, mes
+    """
+    return ler_sql(query, params=params)
+
+def carregar_totais_empresas(filtros=SEM_FILTROS):
+    where, params = clausula(filtros)
+    query = f"""
+    SELECT
+        empresa_sigla,
+        empresa_nome,
+        SUM(combustivel_litros) AS combustivel_litros_total,
+        SUM(passageiros_pagos) AS passageiros_pagos_total,
+        SUM(passageiros_gratis) AS passageiros_gratis_total,
+        SUM(distancia_voada_km) AS distancia_voada_km_total,
+        SUM(decolagens) AS decolagens
+    FROM resumo_mensal
+    {where}
+    GROUP BY empresa_sigla, empresa_nome
+    ORDER BY empresa_sigla, empresa_nome
+    """
+    return ler_sql(query, params=params)
+
+def carregar_voos_empresas(empresas: tuple[str, ...], filtros=SEM_FILTROS):
+    placeholders = ", ".join("?" * len(empresas))
+    where, params = clausula(filtros, "AND")
+    query = f"""
+    SELECT ano, mes, origem_sigla, destino_sigla, combustivel_litros, passageiros_pagos, distancia_voada_km
+    FROM voos
+    WHERE empresa_nome IN ({placeholders}) {where}
+    """
+    return ler_sql(query, params=(*empresas, *params))
+
+def carregar_consumo_medio(coluna: str, filtros=SEM_FILTROS):
+    # coluna é sempre 'origem_pais' ou 'origem_continente' (nunca vem do usuário)
+    where, params = clausula(filtros)
+    query = f"""
+    SELECT {coluna}, ROUND(SUM(combustivel_litros) / SUM(registros), 2) AS combustivel_litros
+    FROM resumo_mensal
+    {where}
+    GROUP BY {coluna}
+    ORDER BY combustivel_litros DESC
+    """
+    return ler_sql(query, params=params).set_index(coluna)['combustivel_litros']
@@ -0,0 +1,111 @@
+from data.conexao import ler_sql, ler_varios
+from data.filtros import SEM_FILTROS, clausula
+
+# Consultas da página frontend/empresas.py.
+
+def carregar_dados(filtros=SEM_FILTROS):
+    where, params = clausula(filtros)
+    query = f"""
+    SELECT
+        empresa_nome,
+        SUM(passageiros_pagos + passageiros_gratis) AS total_passageiros,
+        SUM(carga_paga_kg + carga_gratis_kg + correio_kg) AS total_carga_kg,
+        SUM(distancia_voada_km) AS total_distancia_km,
+        SUM(decolagens) AS total_decolagens,
+        SUM(horas_voadas) AS total_horas_voadas
+    FROM resumo_mensal
+    {where}
+    GROUP BY empresa_nome
+    """
+    df = ler_sql(query, params=params)
+    return df
+
+def carregar_metricas(filtros=SEM_FILTROS):
+    where, params = clausula(filtros)
+    query_base = f"""
+    SELECT
+        empresa_nome,
+        SUM(passageiros_pagos + passageiros_gratis) AS total_passageiros,
+        SUM(decolagens) AS total_decolagens,
+        SUM(horas_voadas) AS total_horas_voadas
+    FROM resumo_mensal
+    {where}
+    GROUP BY empresa_nome
+    """
+
+    # Passageiros, decolagens e horas voadas: consultas independentes, em paralelo
+    resultados = ler_varios({
+        coluna: (query_base + f" ORDER BY {coluna} DESC LIMIT 1", params)
+        for coluna in ("total_passageiros", "total_decolagens", "total_horas_voadas")
+    })
+    return tuple(df.iloc[0] for df in resultados.values())
+
+def load_ranking_horas(top_n: int = 5, filtros=SEM_FILTROS):
+    where, params = clausula(filtros)
+    query = f"""
+    SELECT
+      empresa_nome,
+      SUM(horas_voadas) AS total_horas_voadas
+    FROM resumo_mensal
+    {where}
+    GROUP BY empresa_nome
+    ORDER BY total_horas_voadas DESC
+    LIMIT ?
+    """
+    return ler_sql(query, params=(*params, top_n))
+
+def load_horas_temporal_empresa(empresa: str, filtros=SEM_FILTROS):
+    where, params = clausula(filtros, "AND")
+    query = f"""
+        SELECT
+          empresa_nome,
+          ano,
+          mes,
+          SUM(horas_voadas) AS horas_voadas
+        FROM resumo_mensal
+        WHERE empresa_nome = ? {where}
+        GROUP BY empresa_nome, ano, mes
+        ORDER BY ano, mes
+    """
+    return ler_sql(query, params=(empresa, *params))
+
+def load_duracao_voos(empresa: str | None = None, filtros=SEM_FILTROS):
+    if empresa and empresa != "Todas":
+        where, params = clausula(filtros, "AND")
+        query = f"SELECT horas_voadas FROM voos WHERE empresa_nome = ? {where}"
+        return ler_sql(query, params=(empresa, *params))
+    else:
+        where, params = clausula(filtros)
+        query = f"SELECT empresa_nome, horas_voadas FROM voos {where}"
+        return ler_sql(query, params=params)
+
+def load_empresas(filtros=SEM_FILTROS) -> list[str]:
+    where, params = clausula(filtros)
+    df = ler_sql(f"SELECT DISTINCT empresa_nome FROM resumo_mensal {where} ORDER BY empresa_nome", params=params)
+    return df['empresa_nome'].tolist()
+
+def carregar_consumo_top10(filtros=SEM_FILTROS):
+    where, params = clausula(filtros)
+    query = f"""
+    SELECT
+        empresa_nome,
+        SUM(combustivel_litros) AS total_consumo_litros
+    FROM resumo_mensal
+    {where}
+    GROUP BY empresa_nome
+    ORDER BY total_consumo_litros DESC
+    LIMIT 10  -- Top 10 for scatter
+    """
+    return ler_sql(query, params=params)
+
+def carregar_consumo_combustivel(filtros=SEM_FILTROS):
+    where, params = clausula(filtros)
+    query = f"""
+    SELECT
+        empresa_nome,
+        SUM(combustivel_litros) AS total_consumo_litros
+    FROM resumo_mensal
+    {where}
+    GROUP BY empresa_nome
+    """
+    return ler_sql(query, params=params)
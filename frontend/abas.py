@@ -0,0 +1,37 @@
+import io
+
+import matplotlib.pyplot as plt
+import streamlit as st
+
+from data.conexao import geracao_atual
+
+# Apoio às abas preguiçosas das páginas: com on_change="rerun" o Streamlit
+# informa qual aba está aberta (tab.open) e só ela é executada. O conteúdo
+# montado fica memorizado na sessão, então reabrir uma aba não refaz nada.
+
+# Entradas memorizadas por sessão (as mais antigas saem primeiro)
+MAX_MEMO_SESSAO = 64
+
+def abas(rotulos, key):
+    return st.tabs(rotulos, key=key, on_change="rerun")
+
+def memorizar(nome, funcao, *args):
+    # A geração do banco entra na chave: uma nova carga invalida o memo
+    memo = st.session_state.setdefault("_memo_abas", {})
+    chave = (nome, geracao_atual()[0], args)
+    if chave in memo:
+        memo[chave] = memo.pop(chave)  # mais recente vai para o fim
+        return memo[chave]
+    valor = funcao(*args)
+    memo[chave] = valor
+    while len(memo) > MAX_MEMO_SESSAO:
+        memo.pop(next(iter(memo)))
+    return valor
+
+def figura_png(fig):
+    # Renderiza uma figura matplotlib uma vez (como o st.pyplot faria) e
+    # libera a figura; o PNG memorizado é exibido com st.image
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format="png", bbox_inches="tight", dpi=200)
+    plt.close(fig)
+    return buffer.getvalue()
@@ -1,19 +1,33 @@
 import streamlit as st  
-import sqlite3
 import pandas as pd
+import numpy as np
 import seaborn as sns
 import matplotlib.pyplot as plt
 import plotly.express as px
-import airportsdata
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
+from data.filtros import SEM_FILTROS
+from data.kpis import carregar_kpis
+from data.memoria import memorizado
+from data.paginas import dashboard as consultas
+from frontend.abas import abas, memorizar
+from frontend.diagnostico import etapa, fragmento, medir_figura
+
+# Consultas em data/paginas/dashboard.py, em memória por geração do banco
+carregar_nomes_aeroportos = memorizado(consultas.carregar_nomes_aeroportos)
+carregar_destinos = memorizado(consultas.carregar_destinos)
+carregar_mapa = memorizado(consultas.carregar_mapa)
+carregar_passageiros_mes = memorizado(consultas.carregar_passageiros_mes)
+carregar_carga_mes = memorizado(consultas.carregar_carga_mes)
+carregar_correio_mes = memorizado(consultas.carregar_correio_mes)
+carregar_naturezas = memorizado(consultas.carregar_naturezas)
 
 st.markdown("<h1 style='text-align: center;'>📊 Dashboard </h1>", unsafe_allow_html=True)
 
 st.subheader('', divider=True)
 
-conn = sqlite3.connect("data/voos.db")
-cursor = conn.cursor()
+# Filtros globais da barra lateral (main.py)
+filtros = st.session_state.get("filtros", SEM_FILTROS)
 
 def kpi_box(title, value):
     return f"""
@@ -29,55 +43,42 @@ def kpi_box(title, value):
     </div>
     """
 ## Big Numbers
+# Todos os números vêm de uma única consulta (ou da tabela gravada na carga)
+with etapa("kpis", "consulta"):
+    kpis = carregar_kpis(filtros)
+
+# Sem linhas para os filtros, não há o que exibir
+if kpis.vazio:
+    st.warning("Nenhum dado encontrado para os filtros selecionados.")
+    st.stop()
+
 col1, col2, col3, col4 = st.columns(4)
 
 # Total de Passageiros
-cursor.execute('SELECT SUM(passageiros_pagos + passageiros_gratis) FROM voos')
-total_passageiros = cursor.fetchone()[0]
-
 with col1.container(border=True):
-    st.markdown(kpi_box("Total de Passageiros",f"{total_passageiros:,.0f}"), unsafe_allow_html=True)
+    st.markdown(kpi_box("Total de Passageiros",f"{kpis.total_passageiros:,.0f}"), unsafe_allow_html=True)
 
 # Total de Carga (Kg)
-cursor.execute('SELECT SUM(carga_paga_kg + carga_gratis_kg) FROM voos')
-carga_total = cursor.fetchone()[0]
-
 with col2.container(border=True):
-    st.markdown(kpi_box("Carga Total",f"{carga_total:,.2f} Kg" ), unsafe_allow_html=True)
+    st.markdown(kpi_box("Carga Total",f"{kpis.carga_kg:,.2f} Kg" ), unsafe_allow_html=True)
 
 # Total de Correio
-cursor.execute('SELECT SUM(correio_kg) FROM voos')
-correio_total = cursor.fetchone()[0]
-
 with col3.container(border=True):
-    st.markdown(kpi_box("Total de Correios",f"{correio_total:,.2f} Kg" ), unsafe_allow_html=True)
+    st.markdown(kpi_box("Total de Correios",f"{kpis.correio_kg:,.2f} Kg" ), unsafe_allow_html=True)
 
 # Total de Voos (Decolagens)
-cursor.execute('SELECT SUM(decolagens) FROM voos')
-total_decolagens = cursor.fetchone()[0]
-
 with col4.container(border=True):
-    st.markdown(kpi_box("Total de Decolagens",f"{int(total_decolagens):,.0f}" ), unsafe_allow_html=True)
-
-# Total de Distância Percorrida
-cursor.execute('SELECT SUM(distancia_voada_km) FROM voos')
-distancia_percorrida = cursor.fetchone()[0]
+    st.markdown(kpi_box("Total de Decolagens",f"{kpis.decolagens:,.0f}" ), unsafe_allow_html=True)
 
 col1, col2 = st.columns(2)
 
 # Média de Ocupação (RPK/ASK)
-cursor.execute("SELECT SUM(rpk) / SUM(ask) AS taxa_ocupacao FROM voos")
-taxa_ocupacao = cursor.fetchone()[0]
-
 with col1.container(border=True):
-    st.markdown(kpi_box("Média de Ocupação (RPK / ASK)",f"{taxa_ocupacao:.2%}" ), unsafe_allow_html=True)
+    st.markdown(kpi_box("Média de Ocupação (RPK / ASK)",f"{kpis.taxa_ocupacao:.2%}" ), unsafe_allow_html=True)
 
 # Consumo Total de Combustível
-cursor.execute('SELECT SUM(combustivel_litros) FROM voos')
-combustivel_total = cursor.fetchone()[0]
-
 with col2.container(border=True):
-    st.markdown(kpi_box("Consumo Total de Combustível",f"{combustivel_total:,.2f}" ), unsafe_allow_html=True)
+    st.markdown(kpi_box("Consumo Total de Combustível",f"{kpis.combustivel_litros:,.2f}" ), unsafe_allow_html=True)
 
 ## Evolução Temporal (Gráfico de Linhas)
 # Passageiros pagantes e gratuitos
@@ -85,191 +86,154 @@ with col2.container(border=True):
 st.subheader('', divider=True)
 st.markdown("<h3 style='text-align: center;'>🌍 Mapa de Conexões Aéreas </h3>", unsafe_allow_html=True)
 
-# Carregar dados de aeroportos
-airports = airportsdata.load('ICAO')  # Usa códigos ICAO (4 letras)
-
-# Consulta para obter rotas únicas com nomes
-cursor.execute('''
-    CREATE VIEW IF NOT EXISTS aeroportos AS
-        SELECT DISTINCT
-            origem_sigla,
-            destino_sigla,
-            origem_nome,
-            destino_nome
-        FROM
-            voos
-        WHERE
-            origem_sigla != '' AND destino_sigla != '' AND origem_nome != '' AND destino_nome != ''
-''')
-
-# Criar dois seletores: origem e destino
-col1, col2 = st.columns(2)
-
-# Obter lista completa de aeroportos
-cursor.execute('''
-    SELECT DISTINCT origem_nome FROM aeroportos
-    UNION
-    SELECT DISTINCT destino_nome FROM aeroportos
-    ORDER BY origem_nome
-''')
-nomes_aeroportos = [row[0] for row in cursor.fetchall()]
-
-# Seletor de Origem
-with col1:
-    # Adicionar opção "Todos" no início
-    origens = ["Todos"] + nomes_aeroportos
-    origem_selecionada = st.selectbox('Selecione a Origem:', origens)
-
-# Seletor de Destino
-with col2:
-    destinos = ["Todos"]
-    
-    # Se uma origem foi selecionada, buscar destinos correspondentes
-    if origem_selecionada != "Todos":
-        cursor.execute('''
-            SELECT DISTINCT destino_nome 
-            FROM aeroportos 
-            WHERE origem_nome = ?
-            ORDER BY destino_nome
-        ''', (origem_selecionada,))
-        destinos += [row[0] for row in cursor.fetchall()]
-    
-    destino_selecionado = st.selectbox('Selecione o Destino:', destinos, 
-                                      disabled=(origem_selecionada == "Todos"))
-
-# Consulta para obter rotas de acordo com os filtros
-if origem_selecionada == "Todos":
-    # Mostrar todas as rotas
-    cursor.execute('''
-        SELECT origem_sigla, destino_sigla
-        FROM aeroportos
-    ''')
-    rotas_filtradas = cursor.fetchall()
-    
-elif destino_selecionado == "Todos":
-    # Mostrar todos os destinos da origem selecionada
-    cursor.execute('''
-        SELECT origem_sigla, destino_sigla
-        FROM aeroportos
-        WHERE origem_nome = ?
-    ''', (origem_selecionada,))
-    rotas_filtradas = cursor.fetchall()
-    
-else:
-    # Mostrar rota específica
-    cursor.execute('''
-        SELECT origem_sigla, destino_sigla
-        FROM aeroportos
-        WHERE origem_nome = ? AND destino_nome = ?
-    ''', (origem_selecionada, destino_selecionado))
-    rotas_filtradas = cursor.fetchall()
-
-# Converter para DataFrame
-df_rotas_filtradas = pd.DataFrame(rotas_filtradas, columns=['origem_sigla', 'destino_sigla'])
-
-# Preparar dados para o mapa
-fig = go.Figure()
-
-if not df_rotas_filtradas.empty:
-    # Listas para armazenar todas as coordenadas
-    all_lons = []
-    all_lats = []
-    
-    # Processar cada rota
-    for _, rota in df_rotas_filtradas.iterrows():
-        origem_sigla = rota['origem_sigla']
-        destino_sigla = rota['destino_sigla']
-        
-        if origem_sigla in airports and destino_sigla in airports:
-            # Obter coordenadas
-            orig_coords = airports[origem_sigla]
-            dest_coords = airports[destino_sigla]
-            
-            # Adicionar coordenadas para cálculo de limites
-            all_lons += [orig_coords['lon'], dest_coords['lon']]
-            all_lats += [orig_coords['lat'], dest_coords['lat']]
-            
-            # Adicionar linha da rota
-            fig.add_trace(go.Scattergeo(
-                lon = [orig_coords['lon'], dest_coords['lon']],
-                lat = [orig_coords['lat'], dest_coords['lat']],
-                text = f"{origem_sigla} → {destino_sigla}",
-                line = dict(width=1, color='blue'),
-                mode = 'lines',
-                showlegend = False
-            ))
-            
-            # Adicionar ponto de origem (verde)
-            fig.add_trace(go.Scattergeo(
-                lon = [orig_coords['lon']],
-                lat = [orig_coords['lat']],
-                text = f"Origem: {origem_sigla}",
-                marker = dict(size=10, color='green'),
-                mode = 'markers',
-                showlegend = False
-            ))
-            
-            # Adicionar ponto de destino (vermelho)
-            fig.add_trace(go.Scattergeo(
-                lon = [dest_coords['lon']],
-                lat = [dest_coords['lat']],
-                text = f"Destino: {destino_sigla}",
-                marker = dict(size=10, color='red'),
-                mode = 'markers',
-                showlegend = False
-            ))
-    
-    # Configurar layout do mapa
-    if all_lons and all_lats:
-        fig.update_layout(
-            title_text = f'Rotas Aéreas: {len(rotas_filtradas)} conexões',
-            showlegend = False,
-            title_x=0.4,
-            geo = dict(
-                scope = 'world',
-                projection_type = 'equirectangular',
-                showland = True,
-                landcolor = 'rgb(243, 243, 243)',
-                countrycolor = 'rgb(204, 204, 204)',
-                coastlinewidth = 1,
-                coastlinecolor = 'rgb(204, 204, 204)',
-            ),
-            height = 600,
-            margin = {"r":0,"t":40,"l":0,"b":0}
-        )
-        
-        # Ajustar zoom com margem
-        fig.update_geos(
-            lataxis_range = [min(all_lats) - 5, max(all_lats) + 5],
-            lonaxis_range = [min(all_lons) - 10, max(all_lons) + 10]
+def montar_mapa_rotas(fig, df_rotas, coords):
+    # Preparação dos dados e montagem dos traços medidas em separado (modo diagnóstico)
+    with etapa("mapa", "transformacao"):
+        # Junta as coordenadas de origem e destino de uma vez (rotas sem coordenadas são descartadas)
+        df_mapa = (
+            df_rotas
+            .join(coords.add_prefix('origem_'), on='origem_sigla', how='inner')
+            .join(coords.add_prefix('destino_'), on='destino_sigla', how='inner')
         )
+        if df_mapa.empty:
+            return df_mapa
+
+        # Todas as rotas em um único traço de linhas, separadas por NaN
+        n = len(df_mapa)
+        separador = np.full(n, np.nan)
+        lons = np.column_stack([df_mapa['origem_lon'], df_mapa['destino_lon'], separador]).ravel()
+        lats = np.column_stack([df_mapa['origem_lat'], df_mapa['destino_lat'], separador]).ravel()
+        textos = np.repeat((df_mapa['origem_sigla'] + " → " + df_mapa['destino_sigla']).to_numpy(), 3)
+        origens_unicas = df_mapa.drop_duplicates('origem_sigla')
+        destinos_unicos = df_mapa.drop_duplicates('destino_sigla')
+
+    with etapa("mapa", "figura"):
+        _tracos_mapa(fig, lons, lats, textos, origens_unicas, destinos_unicos)
+    return df_mapa
+
+def _tracos_mapa(fig, lons, lats, textos, origens_unicas, destinos_unicos):
+    fig.add_trace(go.Scattergeo(
+        lon = lons,
+        lat = lats,
+        text = textos,
+        hoverinfo = 'text',
+        line = dict(width=1, color='blue'),
+        mode = 'lines',
+        showlegend = False
+    ))
+
+    # Um traço de marcadores para as origens (verde) e outro para os destinos (vermelho)
+    fig.add_trace(go.Scattergeo(
+        lon = origens_unicas['origem_lon'],
+        lat = origens_unicas['origem_lat'],
+        text = "Origem: " + origens_unicas['origem_sigla'],
+        marker = dict(size=10, color='green'),
+        mode = 'markers',
+        showlegend = False
+    ))
+
+    fig.add_trace(go.Scattergeo(
+        lon = destinos_unicos['destino_lon'],
+        lat = destinos_unicos['destino_lat'],
+        text = "Destino: " + destinos_unicos['destino_sigla'],
+        marker = dict(size=10, color='red'),
+        mode = 'markers',
+        showlegend = False
+    ))
+
+# Seletores, mapa e tabela de rotas num fragmento: trocar a origem ou o
+# destino reexecuta só esta seção, não a página inteira. Tudo o que ela usa
+# vem dos argumentos ou das consultas em data/paginas/dashboard.py.
+@fragmento
+def secao_mapa(filtros):
+    # Criar dois seletores: origem e destino
+    col1, col2 = st.columns(2)
+
+    # Obter lista completa de aeroportos
+    with etapa("mapa", "consulta"):
+        nomes_aeroportos = carregar_nomes_aeroportos(filtros)
+
+    # Seletor de Origem
+    with col1:
+        # Adicionar opção "Todos" no início
+        origens = ["Todos"] + nomes_aeroportos
+        origem_selecionada = st.selectbox('Selecione a Origem:', origens)
+
+    # Seletor de Destino
+    with col2:
+        destinos = ["Todos"]
+
+        # Se uma origem foi selecionada, buscar destinos correspondentes
+        if origem_selecionada != "Todos":
+            destinos += carregar_destinos(origem_selecionada, filtros)
+
+        destino_selecionado = st.selectbox('Selecione o Destino:', destinos, 
+                                          disabled=(origem_selecionada == "Todos"))
+
+    # Rotas conforme a origem/destino escolhidos, coordenadas e nomes dos aeroportos
+    with etapa("mapa", "consulta"):
+        resultados = carregar_mapa(origem_selecionada, destino_selecionado, filtros)
+    df_rotas_filtradas = resultados["rotas"]
+
+    # Preparar dados para o mapa
+    fig = go.Figure()
+
+    if not df_rotas_filtradas.empty:
+        coords = resultados["coords"].set_index('sigla')
+        df_mapa = montar_mapa_rotas(fig, df_rotas_filtradas, coords)
+
+        # Configurar layout do mapa
+        if not df_mapa.empty:
+            all_lats = pd.concat([df_mapa['origem_lat'], df_mapa['destino_lat']])
+            all_lons = pd.concat([df_mapa['origem_lon'], df_mapa['destino_lon']])
+            fig.update_layout(
+                title_text = f'Rotas Aéreas: {len(df_rotas_filtradas)} conexões',
+                showlegend = False,
+                title_x=0.4,
+                geo = dict(
+                    scope = 'world',
+                    projection_type = 'equirectangular',
+                    showland = True,
+                    landcolor = 'rgb(243, 243, 243)',
+                    countrycolor = 'rgb(204, 204, 204)',
+                    coastlinewidth = 1,
+                    coastlinecolor = 'rgb(204, 204, 204)',
+                ),
+                height = 600,
+                margin = {"r":0,"t":40,"l":0,"b":0}
+            )
+
+            # Ajustar zoom com margem
+            fig.update_geos(
+                lataxis_range = [min(all_lats) - 5, max(all_lats) + 5],
+                lonaxis_range = [min(all_lons) - 10, max(all_lons) + 10]
+            )
+        else:
+            st.warning("Nenhuma rota válida encontrada com os filtros selecionados.")
     else:
-        st.warning("Nenhuma rota válida encontrada com os filtros selecionados.")
-else:
-    if origem_selecionada != "Todos":
-        st.warning("Nenhuma rota encontrada com os filtros selecionados.")
-    else:
-        st.info("Selecione uma origem para visualizar as rotas aéreas")
-
-# Mostrar o gráfico
-st.plotly_chart(fig)
-
-# Mostrar tabela com rotas filtradas
-if not df_rotas_filtradas.empty:
-    with st.expander("Ver detalhes das rotas"):
-        # Adicionar nomes completos
-        df_exibir = df_rotas_filtradas.copy()
-        
-        # Obter nomes dos aeroportos
-        nomes_dict = {}
-        cursor.execute("SELECT origem_sigla, origem_nome FROM aeroportos")
-        for sigla, nome in cursor.fetchall():
-            nomes_dict[sigla] = nome
-        
-        df_exibir['origem_nome'] = df_exibir['origem_sigla'].map(nomes_dict)
-        df_exibir['destino_nome'] = df_exibir['destino_sigla'].map(nomes_dict)
-        
-        st.dataframe(df_exibir[['origem_sigla', 'origem_nome', 'destino_sigla', 'destino_nome']])
+        if origem_selecionada != "Todos":
+            st.warning("Nenhuma rota encontrada com os filtros selecionados.")
+        else:
+            st.info("Selecione uma origem para visualizar as rotas aéreas")
+
+    # Mostrar o gráfico
+    st.plotly_chart(medir_figura("mapa", fig))
+
+    # Mostrar tabela com rotas filtradas
+    if not df_rotas_filtradas.empty:
+        with st.expander("Ver detalhes das rotas"):
+            # Adicionar nomes completos
+            df_exibir = df_rotas_filtradas.copy()
+
+            # Obter nomes dos aeroportos
+            nomes_dict = resultados["nomes"].set_index('origem_sigla')['origem_nome'].to_dict()
+
+            df_exibir['origem_nome'] = df_exibir['origem_sigla'].map(nomes_dict)
+            df_exibir['destino_nome'] = df_exibir['destino_sigla'].map(nomes_dict)
+
+            st.dataframe(df_exibir[['origem_sigla', 'origem_nome', 'destino_sigla', 'destino_nome']])
+
+secao_mapa(filtros)
 
 st.subheader('', divider=True)
 
@@ -289,27 +253,14 @@ meses = {
     12: 'Dezembro'
 }
 
-with col1.container(border=True):
-    tab1, tab2, tab3 = st.tabs(['Passageiros x Mês', 'Carga x Mês', 'Correio x Mês'])
-    with tab1:
-        cursor.execute(''' 
-            CREATE VIEW IF NOT EXISTS passageiros_por_mes AS
-                SELECT
-                    mes,
-                    SUM(passageiros_pagos + passageiros_gratis) AS total_passageiros
-                FROM
-                    voos
-                GROUP BY
-                    mes
-                ORDER BY
-                    mes
-        ''')
-        cursor.execute('SELECT * FROM passageiros_por_mes')
-        column_names = [description[0] for description in cursor.description]
-        rows = cursor.fetchall()
-
-        df_pass = pd.DataFrame(rows, columns=column_names)
+# Gráficos mensais em abas preguiçosas: cada figura só é montada quando a
+# aba é aberta pela primeira vez e fica memorizada na sessão
+def figura_passageiros_mes(filtros):
+    with etapa("mensal", "consulta"):
+        df_pass = carregar_passageiros_mes(filtros)
+    with etapa("mensal", "transformacao"):
         df_pass['mes_nome'] = df_pass['mes'].map(meses)
+    with etapa("mensal", "figura"):
         fig = px.line(df_pass,
                     x='mes_nome',
                     y='total_passageiros',
@@ -320,29 +271,16 @@ with col1.container(border=True):
             margin=dict(l=10, r=30, t=50, b=0),  # Margens para evitar cortes
             title_x=0.1  # Centraliza o título
         )
-        st.plotly_chart(fig)
+    return fig
 
-    with tab2:
-        # Carga paga e correio
-        cursor.execute('''
-                        CREATE VIEW IF NOT EXISTS carga_correio AS
-                            SELECT
-                                mes,
-                                SUM(carga_paga_kg) AS total_carga
-                            FROM
-                                voos
-                            GROUP BY
-                                mes
-                            ORDER BY
-                                mes               
-        ''')
-        cursor.execute('SELECT * FROM carga_correio')
-        column_names = [description[0] for description in cursor.description]
-        rows = cursor.fetchall()
-
-        df_carga = pd.DataFrame(rows, columns=column_names)
+def figura_carga_mes(filtros):
+    # Carga paga e correio
+    with etapa("mensal", "consulta"):
+        df_carga = carregar_carga_mes(filtros)
+    with etapa("mensal", "transformacao"):
         df_carga['mes_nome'] = df_carga['mes'].map(meses)
 
+    with etapa("mensal", "figura"):
         fig = px.line(df_carga,
                     x='mes_nome',
                     y='total_carga',
@@ -353,28 +291,15 @@ with col1.container(border=True):
             margin=dict(l=10, r=30, t=50, b=0),  # Margens para evitar cortes
             title_x=0.30  # Centraliza o título
         )
-        st.plotly_chart(fig)
-    
-    with tab3:
-        cursor.execute('''
-                        CREATE VIEW IF NOT EXISTS correio AS
-                            SELECT
-                                mes,
-                                SUM(correio_kg) AS total_correio
-                            FROM
-                                voos
-                            GROUP BY
-                                mes
-                            ORDER BY
-                                mes               
-        ''')   
-        cursor.execute('SELECT * FROM correio')
-        column_names = [description[0] for description in cursor.description]
-        rows = cursor.fetchall()
-
-        df_correio = pd.DataFrame(rows, columns=column_names)
-        df_correio['mes_nome'] = df_correio['mes'].map(meses)     
+    return fig
 
+def figura_correio_mes(filtros):
+    with etapa("mensal", "consulta"):
+        df_correio = carregar_correio_mes(filtros)
+    with etapa("mensal", "transformacao"):
+        df_correio['mes_nome'] = df_correio['mes'].map(meses)
+
+    with etapa("mensal", "figura"):
         fig = px.line(df_correio,
                     x='mes_nome',
                     y='total_correio',
@@ -385,29 +310,39 @@ with col1.container(border=True):
             margin=dict(l=10, r=30, t=50, b=0),  # Margens para evitar cortes
             title_x=0.23  # Centraliza o título
         )
-        st.plotly_chart(fig)
+    return fig
+
+@fragmento
+def secao_mensal(filtros):
+    tab1, tab2, tab3 = abas(['Passageiros x Mês', 'Carga x Mês', 'Correio x Mês'], key='abas_mensal')
+    with tab1:
+        if tab1.open:
+            st.plotly_chart(medir_figura("mensal", memorizar('passageiros_mes', figura_passageiros_mes, filtros)))
+    with tab2:
+        if tab2.open:
+            st.plotly_chart(medir_figura("mensal", memorizar('carga_mes', figura_carga_mes, filtros)))
+    with tab3:
+        if tab3.open:
+            st.plotly_chart(medir_figura("mensal", memorizar('correio_mes', figura_correio_mes, filtros)))
+
+with col1.container(border=True):
+    secao_mensal(filtros)
 
-    
 ## Dristribuição de Natures dos Voos (Gráfico de Pizza)
 # Doméstico vs Internacional 
 with col2.container(border=True):
-    cursor.execute('SELECT natureza, COUNT(decolagens) AS total_voos FROM voos GROUP BY natureza')
-    column_names = [description[0] for description in cursor.description]
-    rows = cursor.fetchall()
-
-    df_natureza = pd.DataFrame(rows, columns=column_names)
-
-    fig = px.pie(df_natureza,
-                 names='natureza',
-                 values='total_voos',
-                 title='Distribuição de Voos: Domésticos vs. Internacionais'
-    )
-    fig.update_layout(
-    height=508,  # Altura do gráfico
-    margin=dict(l=10, r=30, t=50, b=0),  # Margens para evitar cortes
-    title_x=0.23  # Centraliza o título
-    )
-    st.plotly_chart(fig)
-
-
-conn.close()
\ No newline at end of file
+    with etapa("natureza", "consulta"):
+        df_natureza = carregar_naturezas(filtros)
+
+    with etapa("natureza", "figura"):
+        fig = px.pie(df_natureza,
+                     names='natureza',
+                     values='total_voos',
+                     title='Distribuição de Voos: Domésticos vs. Internacionais'
+        )
+        fig.update_layout(
+        height=508,  # Altura do gráfico
+        margin=dict(l=10, r=30, t=50, b=0),  # Margens para evitar cortes
+        title_x=0.23  # Centraliza o título
+        )
+    st.plotly_chart(medir_figura("natureza", fig))
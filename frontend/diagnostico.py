@@ -0,0 +1,175 @@
+import contextvars
+import functools
+import json
+import time
+import uuid
+from collections import defaultdict
+from contextlib import contextmanager
+
+import pandas as pd
+import streamlit as st
+
+from data import instrumentacao
+
+# Modo de diagnóstico opcional, ligado por ?diagnostico=1 na URL ou pela
+# chave na barra lateral (main.py). As páginas marcam cada seção por fase
+# (consulta, transformação, figura, serialização) e o tamanho das figuras;
+# o painel junta isso às consultas registradas em data/instrumentacao.py
+# com o identificador da execução. Fragmentos marcados com @fragmento
+# têm as reexecuções medidas à parte e mostram o próprio painel.
+# Com o modo desligado, etapa() e medir_figura() não medem nada.
+
+FASES = ("consulta", "transformacao", "figura", "serializacao")
+
+def ativo():
+    return st.session_state.get("diagnostico", False)
+
+# Registro da reexecução de fragmento em curso nesta thread
+_registro_fragmento = contextvars.ContextVar("registro_fragmento", default=None)
+
+def _novo_registro(pagina, fragmento=None):
+    return {
+        "id": uuid.uuid4().hex,
+        "pagina": pagina,
+        "fragmento": fragmento,
+        "inicio": time.time(),
+        "etapas": [],
+        "figuras": [],
+        "concluida": False,
+    }
+
+def iniciar_execucao(pagina):
+    # Chamado pelo main.py a cada execução completa da página
+    registro = _novo_registro(pagina)
+    st.session_state["_diagnostico"] = registro
+    instrumentacao.definir_execucao(registro["id"])
+
+def _registro():
+    if not ativo():
+        return None
+    return _registro_fragmento.get() or st.session_state.get("_diagnostico")
+
+def fragmento(funcao):
+    # Substitui @st.fragment. Na execução completa o fragmento conta na
+    # página; nas reexecuções só dele, ganha registro e painel próprios
+    @functools.wraps(funcao)
+    def executar(*args, **kwargs):
+        pagina = _registro()
+        if pagina is None or not pagina["concluida"]:
+            return funcao(*args, **kwargs)
+        registro = _novo_registro(pagina["pagina"], funcao.__name__)
+        token_registro = _registro_fragmento.set(registro)
+        token_execucao = instrumentacao.definir_execucao(registro["id"])
+        try:
+            resultado = funcao(*args, **kwargs)
+        finally:
+            instrumentacao.restaurar_execucao(token_execucao)
+            _registro_fragmento.reset(token_registro)
+        _renderizar(relatorio(registro))
+        return resultado
+    return st.fragment(executar)
+
+@contextmanager
+def etapa(secao, fase):
+    registro = _registro()
+    if registro is None:
+        yield
+        return
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        registro["etapas"].append({"secao": secao, "fase": fase, "ms": (time.perf_counter() - inicio) * 1000})
+
+def medir_figura(secao, fig):
+    # Serializa a figura como o Streamlit fará ao enviá-la ao navegador
+    # (JSON do Plotly; PNG já renderizado para as de matplotlib) e devolve
+    # a própria figura, para uso direto em st.plotly_chart/st.image
+    registro = _registro()
+    if registro is None:
+        return fig
+    inicio = time.perf_counter()
+    if isinstance(fig, bytes):
+        tipo, tamanho = "png", len(fig)
+    else:
+        tipo, tamanho = "plotly", len(fig.to_json().encode("utf-8"))
+    ms = (time.perf_counter() - inicio) * 1000
+    registro["etapas"].append({"secao": secao, "fase": "serializacao", "ms": ms})
+    registro["figuras"].append({"secao": secao, "tipo": tipo, "bytes": tamanho, "ms": ms})
+    return fig
+
+def relatorio(registro=None):
+    registro = registro or st.session_state.get("_diagnostico")
+    if registro is None:
+        return None
+    # Consultas feitas por esta execução (de outras sessões e do aquecimento
+    # não entram), por loader/fragmento. Resultados memorizados
+    # (frontend/abas.py, data/memoria.py) nem chegam a ler_sql.
+    consultas = defaultdict(lambda: {"chamadas": 0, "acertos_cache": 0, "falhas_cache": 0, "ms": 0.0})
+    for execucao in instrumentacao.execucoes_recentes():
+        if execucao["execucao"] != registro["id"]:
+            continue
+        resumo = consultas[execucao["secao"]]
+        resumo["chamadas"] += 1
+        resumo["acertos_cache" if execucao["cache"] else "falhas_cache"] += 1
+        resumo["ms"] += execucao["ms"]
+
+    return {
+        "pagina": registro["pagina"],
+        "fragmento": registro["fragmento"],
+        "inicio": registro["inicio"],
+        "duracao_ms": (time.time() - registro["inicio"]) * 1000,
+        "etapas": list(registro["etapas"]),
+        "figuras": list(registro["figuras"]),
+        "consultas": [{"secao": secao, **resumo} for secao, resumo in consultas.items()],
+    }
+
+def painel():
+    # Fim da execução completa: daqui em diante os fragmentos que rodarem
+    # são reexecuções
+    registro = st.session_state.get("_diagnostico")
+    if registro is None:
+        return
+    registro["concluida"] = True
+    _renderizar(relatorio(registro))
+
+def _renderizar(dados):
+    if dados["fragmento"]:
+        titulo = f"Diagnóstico: {dados['fragmento']}"
+        legenda = f"Fragmento '{dados['fragmento']}' ({dados['pagina']}) em {dados['duracao_ms']:,.0f} ms"
+        arquivo = f"diagnostico_{dados['pagina']}_{dados['fragmento']}.json"
+    else:
+        titulo = "Diagnóstico"
+        legenda = f"Página '{dados['pagina']}' em {dados['duracao_ms']:,.0f} ms"
+        arquivo = f"diagnostico_{dados['pagina']}.json"
+    with st.expander(titulo, expanded=not dados["fragmento"]):
+        st.caption(legenda)
+
+        if dados["etapas"]:
+            etapas = (
+                pd.DataFrame(dados["etapas"])
+                .pivot_table(index="secao", columns="fase", values="ms", aggfunc="sum", fill_value=0)
+                .reindex(columns=list(FASES), fill_value=0)
+            )
+            etapas["total"] = etapas.sum(axis=1)
+            st.markdown("**Tempo por seção (ms)**")
+            st.dataframe(etapas.sort_values("total", ascending=False).round(1), use_container_width=True)
+
+        if dados["figuras"]:
+            st.markdown("**Figuras**")
+            st.dataframe(pd.DataFrame(dados["figuras"]).round(1), use_container_width=True, hide_index=True)
+
+        if dados["consultas"]:
+            consultas = pd.DataFrame(dados["consultas"])
+            st.markdown(
+                f"**Consultas**: {consultas['acertos_cache'].sum()} acertos / "
+                f"{consultas['falhas_cache'].sum()} falhas no cache"
+            )
+            st.dataframe(consultas.round(1), use_container_width=True, hide_index=True)
+
+        st.download_button(
+            "Exportar JSON",
+            data=json.dumps(dados, ensure_ascii=False, indent=2, default=str),
+            file_name=arquivo,
+            mime="application/json",
+        )
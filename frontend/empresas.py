@@ -1,57 +1,35 @@
 import streamlit as st
-import sqlite3
 import pandas as pd
 import plotly.express as px
 from plotly import graph_objects as go  
-
-conn = sqlite3.connect('data/voos.db')
-
-@st.cache_data
-def carregar_dados():
-    query = """
-    SELECT 
-        empresa_nome,
-        SUM(passageiros_pagos + passageiros_gratis) AS total_passageiros,
-        SUM(carga_paga_kg + carga_gratis_kg + correio_kg) AS total_carga_kg,
-        SUM(distancia_voada_km) AS total_distancia_km,
-        SUM(decolagens) AS total_decolagens,
-        SUM(horas_voadas) AS total_horas_voadas
-    FROM voos
-    GROUP BY empresa_nome
-    """
-    df = pd.read_sql_query(query, conn)
-    return df
-
-@st.cache_data
-def carregar_metricas():
-    query_base = """
-    SELECT 
-        empresa_nome,
-        SUM(passageiros_pagos + passageiros_gratis) AS total_passageiros,
-        SUM(decolagens) AS total_decolagens,
-        SUM(horas_voadas) AS total_horas_voadas
-    FROM voos
-    GROUP BY empresa_nome
-    """
-    
-    # Passageiros
-    q1 = query_base + " ORDER BY total_passageiros DESC LIMIT 1"
-    r1 = pd.read_sql_query(q1, conn).iloc[0]
-    
-    # Decolagens
-    q2 = query_base + " ORDER BY total_decolagens DESC LIMIT 1"
-    r2 = pd.read_sql_query(q2, conn).iloc[0]
-  
-    # Horas Voadas
-    q3 = query_base + " ORDER BY total_horas_voadas DESC LIMIT 1"
-    r3 = pd.read_sql_query(q3, conn).iloc[0]
-    
-    return r1, r2, r3
+from data.filtros import SEM_FILTROS
+from data.memoria import memorizado
+from data.paginas import empresas as consultas
+from frontend.abas import abas, memorizar
+from frontend.diagnostico import etapa, fragmento, medir_figura
+
+# Consultas em data/paginas/empresas.py, em memória por geração do banco
+carregar_dados = memorizado(consultas.carregar_dados)
+carregar_metricas = memorizado(consultas.carregar_metricas)
+load_ranking_horas = memorizado(consultas.load_ranking_horas)
+load_horas_temporal_empresa = memorizado(consultas.load_horas_temporal_empresa)
+load_empresas = memorizado(consultas.load_empresas)
+carregar_consumo_top10 = memorizado(consultas.carregar_consumo_top10)
+carregar_consumo_combustivel = memorizado(consultas.carregar_consumo_combustivel)
 
 st.markdown("<h1 style='text-align: center;'>✈️ Benchmark entre Empresas Aéreas</h1>", unsafe_allow_html=True)
 st.divider()
 
-r1, r2, r3 = carregar_metricas()
+# Filtros globais da barra lateral (main.py)
+filtros = st.session_state.get("filtros", SEM_FILTROS)
+with etapa("metricas", "consulta"):
+    vazio = carregar_dados(filtros).empty
+if vazio:
+    st.warning("Nenhum dado encontrado para os filtros selecionados.")
+    st.stop()
+
+with etapa("metricas", "consulta"):
+    r1, r2, r3 = carregar_metricas(filtros)
 
 c1, c2, c3 = st.columns(3)
 c1.container(border=True).metric(
@@ -73,168 +51,131 @@ c3.container(border=True).metric(
 st.subheader("",divider = True)
 st.markdown(f"<h2 style='text-align: center;'>📊 Top 10 Empresas </h2>", unsafe_allow_html=True)
 
-tab1, tab2, tabs3= st.tabs([
-    "🧑‍🤝‍🧑 Top 10 Passageiros",
-    "📦 Top 10 Carga (kg)",
-    "🛫 Top 10 Distância (km)"
-])
-
-with tab1:
-    df = carregar_dados()
-
-    if df.empty:
-        st.warning("Nenhum dado encontrado na tabela.")
-    else:
-        df_passageiros = df.sort_values("total_passageiros", ascending=False).head(10)
-        fig_passageiros = px.bar(
-            df_passageiros,
-            y="empresa_nome",
-            x="total_passageiros",
-            title="Total de Passageiros por Empresa",
-            color="empresa_nome",
-            labels={"empresa_nome": "Empresa", "total_passageiros": "Passageiros"},
-            orientation="h",
-            color_discrete_sequence=px.colors.qualitative.Plotly
-        )
-        fig_passageiros.update_layout(
-            showlegend=False,
-            yaxis={"tickfont": {"size": 10}},
-            height=400,
-            title_x = 0.4
-        )
-        st.container(border=True).plotly_chart(fig_passageiros, use_container_width=True)
-
-with tab2:
-    df = carregar_dados()
-
-    if df.empty:
-        st.warning("Nenhum dado encontrado na tabela.")
-    else:
-        df_carga = df.sort_values("total_carga_kg", ascending=False).head(10)
-        fig_carga = px.bar(
-            df_carga,
-            y="empresa_nome",
-            x="total_carga_kg",
-            title="Total de Carga (kg) por Empresa",
-            color="empresa_nome",
-            labels={"empresa_nome": "Empresa", "total_carga_kg": "Carga (kg)"},
-            orientation="h",
-            color_discrete_sequence=px.colors.qualitative.Plotly
-        )
-        fig_carga.update_layout(
-            showlegend=False,
-            yaxis={"tickfont": {"size": 10}},
-            height=400,
-            title_x = 0.4
-        )
-        st.container(border=True).plotly_chart(fig_carga, use_container_width=True)
-
-with tabs3:
-    df = carregar_dados()
-
-    if df.empty:
-        st.warning("Nenhum dado encontrado na tabela.")
-    else:
-        df_distancia = df.sort_values("total_distancia_km", ascending=False).head(10)
-        fig_distancia = px.bar(
-            df_distancia,
-            y="empresa_nome",
-            x="total_distancia_km",
-            title="Total de Distância Voadas (km) por Empresa",
-            color="empresa_nome",
-            labels={"empresa_nome": "Empresa", "total_distancia_km": "Distância (km)"},
-            orientation="h",
-            color_discrete_sequence=px.colors.qualitative.Plotly
-        )
-        fig_distancia.update_layout(
-            showlegend=False,
-            yaxis={"tickfont": {"size": 10}},
-            height=400,
-            title_x = 0.4
-        )
-        st.container(border=True).plotly_chart(fig_distancia, use_container_width=True)
+# Top 10 em abas preguiçosas: cada gráfico só é montado quando a aba é
+# aberta pela primeira vez e fica memorizado na sessão
+def figura_top10_passageiros(filtros):
+    df = carregar_dados(filtros)
+    df_passageiros = df.sort_values("total_passageiros", ascending=False).head(10)
+    fig_passageiros = px.bar(
+        df_passageiros,
+        y="empresa_nome",
+        x="total_passageiros",
+        title="Total de Passageiros por Empresa",
+        color="empresa_nome",
+        labels={"empresa_nome": "Empresa", "total_passageiros": "Passageiros"},
+        orientation="h",
+        color_discrete_sequence=px.colors.qualitative.Plotly
+    )
+    fig_passageiros.update_layout(
+        showlegend=False,
+        yaxis={"tickfont": {"size": 10}},
+        height=400,
+        title_x = 0.4
+    )
+    return fig_passageiros
+
+def figura_top10_carga(filtros):
+    df = carregar_dados(filtros)
+    df_carga = df.sort_values("total_carga_kg", ascending=False).head(10)
+    fig_carga = px.bar(
+        df_carga,
+        y="empresa_nome",
+        x="total_carga_kg",
+        title="Total de Carga (kg) por Empresa",
+        color="empresa_nome",
+        labels={"empresa_nome": "Empresa", "total_carga_kg": "Carga (kg)"},
+        orientation="h",
+        color_discrete_sequence=px.colors.qualitative.Plotly
+    )
+    fig_carga.update_layout(
+        showlegend=False,
+        yaxis={"tickfont": {"size": 10}},
+        height=400,
+        title_x = 0.4
+    )
+    return fig_carga
+
+def figura_top10_distancia(filtros):
+    df = carregar_dados(filtros)
+    df_distancia = df.sort_values("total_distancia_km", ascending=False).head(10)
+    fig_distancia = px.bar(
+        df_distancia,
+        y="empresa_nome",
+        x="total_distancia_km",
+        title="Total de Distância Voadas (km) por Empresa",
+        color="empresa_nome",
+        labels={"empresa_nome": "Empresa", "total_distancia_km": "Distância (km)"},
+        orientation="h",
+        color_discrete_sequence=px.colors.qualitative.Plotly
+    )
+    fig_distancia.update_layout(
+        showlegend=False,
+        yaxis={"tickfont": {"size": 10}},
+        height=400,
+        title_x = 0.4
+    )
+    return fig_distancia
+
+@fragmento
+def secao_top10(filtros):
+    tab1, tab2, tabs3 = abas([
+        "🧑‍🤝‍🧑 Top 10 Passageiros",
+        "📦 Top 10 Carga (kg)",
+        "🛫 Top 10 Distância (km)"
+    ], key='abas_top10')
+
+    with tab1:
+        if tab1.open:
+            with etapa("top10", "figura"):
+                fig = memorizar('top10_passageiros', figura_top10_passageiros, filtros)
+            st.container(border=True).plotly_chart(medir_figura("top10", fig), use_container_width=True)
+
+    with tab2:
+        if tab2.open:
+            with etapa("top10", "figura"):
+                fig = memorizar('top10_carga', figura_top10_carga, filtros)
+            st.container(border=True).plotly_chart(medir_figura("top10", fig), use_container_width=True)
+
+    with tabs3:
+        if tabs3.open:
+            with etapa("top10", "figura"):
+                fig = memorizar('top10_distancia', figura_top10_distancia, filtros)
+            st.container(border=True).plotly_chart(medir_figura("top10", fig), use_container_width=True)
+
+secao_top10(filtros)
 
 st.subheader("",divider = True)
 
-@st.cache_data
-def load_ranking_horas(top_n: int = 5):
-    query = """
-    SELECT 
-      empresa_nome,
-      SUM(horas_voadas) AS total_horas_voadas
-    FROM voos
-    GROUP BY empresa_nome
-    ORDER BY total_horas_voadas DESC
-    LIMIT ?
-    """
-    return pd.read_sql_query(query, conn, params=(top_n,))
-
-@st.cache_data
-def load_horas_temporal_empresa(empresa: str):
-    query = """
-        SELECT 
-          empresa_nome,
-          ano,
-          mes,
-          SUM(horas_voadas) AS horas_voadas
-        FROM voos
-        WHERE empresa_nome = ?
-        GROUP BY empresa_nome, ano, mes
-        ORDER BY ano, mes
-    """
-    return pd.read_sql_query(query, conn, params=(empresa,))
-
-@st.cache_data
-def load_duracao_voos(empresa: str | None = None):
-    if empresa and empresa != "Todas":
-        query = "SELECT horas_voadas FROM voos WHERE empresa_nome = ?"
-        return pd.read_sql_query(query, conn, params=(empresa,))
-    else:
-        query = "SELECT empresa_nome, horas_voadas FROM voos"
-        return pd.read_sql_query(query, conn)
-
-@st.cache_data
-def load_empresas() -> list[str]:
-    df = pd.read_sql_query("SELECT DISTINCT empresa_nome FROM voos ORDER BY empresa_nome", conn)
-    return df['empresa_nome'].tolist()
-
 st.markdown(f"<h2 style='text-align: center;'>⏱️ Horas Voadas por Empresa </h2>", unsafe_allow_html=True)
-tabs = st.tabs([
-    "🏆 Ranking Top-5",
-    "📈 Evolução Mensal",
-])
-
-with tabs[0]:
-    st.markdown(f"<h3 style='text-align: center;'>Top-5 Empresas por Horas Voadas</h3>", unsafe_allow_html=True)
-    top5 = load_ranking_horas(5)
+def figura_ranking_horas(filtros):
+    top5 = load_ranking_horas(5, filtros)
     if top5.empty:
-        st.warning("Nenhum dado encontrado para as empresas.")
-    else:
-        fig_rank = px.bar(
-            top5,
-            x='total_horas_voadas',
-            y='empresa_nome',
-            orientation='h',
-            labels={'empresa_nome': 'Empresa', 'total_horas_voadas': 'Horas Voadas'},
-            color_discrete_sequence=['#1f77b4']
-        )
-        fig_rank.update_layout(
-            yaxis={'categoryorder': 'total ascending', 'tickfont': {'size': 10}},
-            showlegend=False,
-            height=400
-        )
-        st.container(border=True).plotly_chart(fig_rank, use_container_width=True)
-
-        st.dataframe(top5, use_container_width=True, height=220)
+        return top5, None
+    fig_rank = px.bar(
+        top5,
+        x='total_horas_voadas',
+        y='empresa_nome',
+        orientation='h',
+        labels={'empresa_nome': 'Empresa', 'total_horas_voadas': 'Horas Voadas'},
+        color_discrete_sequence=['#1f77b4']
+    )
+    fig_rank.update_layout(
+        yaxis={'categoryorder': 'total ascending', 'tickfont': {'size': 10}},
+        showlegend=False,
+        height=400
+    )
+    return top5, fig_rank
 
-with tabs[1]:
+# Só a evolução mensal reexecuta ao trocar a empresa selecionada
+@fragmento
+def secao_evolucao_mensal(filtros):
     st.markdown(f"<h3 style='text-align: center;'>📈 Evolução Mensal de Horas Voadas</h3>", unsafe_allow_html=True)
 
     empresa_selecionada = st.selectbox(
         "Selecione a Empresa",
-        options=load_empresas()
+        options=load_empresas(filtros)
     )
-    df_temp = load_horas_temporal_empresa(empresa_selecionada)
+    df_temp = load_horas_temporal_empresa(empresa_selecionada, filtros)
 
     if df_temp.empty:
         st.warning("Não há registros para a empresa selecionada.")
@@ -258,12 +199,39 @@ with tabs[1]:
             yaxis_tickformat=".0f",
             title_x = 0.35
         )
-        st.container(border=True).plotly_chart(fig_time, use_container_width=True)
+        st.container(border=True).plotly_chart(medir_figura("evolucao_mensal", fig_time), use_container_width=True)
+
+# Só a aba aberta é executada; a evolução mensal é um fragmento próprio
+# para a troca de empresa não refazer o ranking
+@fragmento
+def secao_horas_voadas(filtros):
+    tab_ranking, tab_evolucao = abas([
+        "🏆 Ranking Top-5",
+        "📈 Evolução Mensal",
+    ], key='abas_horas')
+
+    if tab_ranking.open:
+        with tab_ranking:
+            st.markdown(f"<h3 style='text-align: center;'>Top-5 Empresas por Horas Voadas</h3>", unsafe_allow_html=True)
+            with etapa("horas_voadas", "figura"):
+                top5, fig_rank = memorizar("ranking_horas", figura_ranking_horas, filtros)
+            if top5.empty:
+                st.warning("Nenhum dado encontrado para as empresas.")
+            else:
+                st.container(border=True).plotly_chart(medir_figura("horas_voadas", fig_rank), use_container_width=True)
+
+                st.dataframe(top5, use_container_width=True, height=220)
+
+    if tab_evolucao.open:
+        with tab_evolucao:
+            secao_evolucao_mensal(filtros)
+
+secao_horas_voadas(filtros)
 
 st.subheader("", divider = True)
 st.markdown(f"<h2 style='text-align: center;'>🚀 Decolagens vs Distância Voada</h2>", unsafe_allow_html=True)
 
-df = carregar_dados()
+df = carregar_dados(filtros)
 
 if df.empty:
     st.warning("Nenhum dado disponível.")
@@ -291,30 +259,17 @@ else:
         margin=dict(l=40, r=20, t=20, b=40)
     )
 
-    st.container(border=True).plotly_chart(fig, use_container_width=True)
+    st.container(border=True).plotly_chart(medir_figura("decolagens_distancia", fig), use_container_width=True)
 
 st.subheader("", divider = True)
 st.markdown(f"<h2 style='text-align: center;'>⛽ Consumo de Combustível por Empresa</h2>", unsafe_allow_html=True)
 
 
-@st.cache_data
-def carregar_consumo_combustivel():
-    query = """
-    SELECT 
-        empresa_nome,
-        SUM(combustivel_litros) AS total_consumo_litros
-    FROM voos
-    GROUP BY empresa_nome
-    ORDER BY total_consumo_litros DESC
-    LIMIT 10  -- Top 10 for scatter
-    """
-    return pd.read_sql_query(query, conn)
-
-df_consumo = carregar_consumo_combustivel()
+df_consumo = carregar_consumo_top10(filtros)
 if df_consumo.empty:
     st.warning("Nenhum dado de consumo de combustível encontrado.")
 else:
-    df = carregar_dados()  
+    df = carregar_dados(filtros)  
     df_consumo = df_consumo.merge(
         df[["empresa_nome", "total_distancia_km", "total_decolagens"]], 
         on="empresa_nome", 
@@ -352,24 +307,13 @@ else:
         hovermode="closest",
         title_x = 0.35
     )
-    st.container(border=True).plotly_chart(fig_consumo, use_container_width=True)
+    st.container(border=True).plotly_chart(medir_figura("consumo_combustivel", fig_consumo), use_container_width=True)
 
 st.subheader("", divider = True)
 st.markdown(f"<h2 style='text-align: center;'>🔁 Eficiência Operacional Comparada</h2>", unsafe_allow_html=True)
 
-@st.cache_data
-def carregar_consumo_combustivel():
-    query = """
-    SELECT 
-        empresa_nome,
-        SUM(combustivel_litros) AS total_consumo_litros
-    FROM voos
-    GROUP BY empresa_nome
-    """
-    return pd.read_sql_query(query, conn)
-
-df = carregar_dados()
-df_consumo = carregar_consumo_combustivel()
+df = carregar_dados(filtros)
+df_consumo = carregar_consumo_combustivel(filtros)
 df_eff = df.merge(df_consumo, on="empresa_nome", how="left")
 
 if df_eff.empty:
@@ -410,6 +354,4 @@ else:
         title="Eficiência Operacional Comparada (Top 3 Empresas)",
         title_x = 0.35
     )
-    st.container(border=True).plotly_chart(fig_eff, use_container_width=True)
-
-conn.close()
\ No newline at end of file
+    st.container(border=True).plotly_chart(medir_figura("eficiencia", fig_eff), use_container_width=True)
@@ -1,5 +1,9 @@
 import streamlit as st
-from data.CriacaoBD import criarTable
+from data.CriacaoBD import iniciar_carga
+from data.aquecimento import iniciar_aquecimento, progresso
+from data.conexao import geracao_atual
+from data.filtros import Filtros, carregar_opcoes
+from frontend import diagnostico
 from streamlit import config as _config
 
 _config.set_option("theme.base", "light")
@@ -8,8 +12,50 @@ _config.set_option("theme.backgroundColor", "#ffffff")
 _config.set_option("theme.secondaryBackgroundColor", "#f0f2f6")
 _config.set_option("theme.textColor", "#31333F")
 
+@st.cache_data
+def opcoes_filtros(geracao):
+    # A geração entra na chave do cache para as opções acompanharem novas cargas
+    return carregar_opcoes()
+
+def filtros_globais():
+    # Filtros compartilhados por todas as páginas; o estado dos widgets fica
+    # na sessão, então a seleção se mantém ao trocar de página
+    opcoes = opcoes_filtros(geracao_atual()[0])
+    with st.sidebar:
+        st.header("Filtros")
+        anos = opcoes["anos"]
+        if len(anos) > 1:
+            ano_inicial, ano_final = st.select_slider("Anos", options=anos, value=(anos[0], anos[-1]), key="filtro_anos")
+        else:
+            ano_inicial = ano_final = anos[0] if anos else None
+        mes_inicial, mes_final = st.slider("Meses", 1, 12, (1, 12), key="filtro_meses")
+        empresas = st.multiselect("Empresas", opcoes["empresas"], placeholder="Todas", key="filtro_empresas")
+        natureza = st.selectbox("Natureza", ["Todas"] + opcoes["naturezas"], key="filtro_natureza")
+        grupo_voo = st.selectbox("Grupo de Voo", ["Todos"] + opcoes["grupos_voo"], key="filtro_grupo_voo")
+        origem_pais = st.selectbox("País de Origem", ["Todos"] + opcoes["origem_paises"], key="filtro_origem_pais")
+        destino_pais = st.selectbox("País de Destino", ["Todos"] + opcoes["destino_paises"], key="filtro_destino_pais")
+
+        # Andamento do aquecimento dos caches (data/aquecimento.py)
+        estado = progresso()
+        if estado["geracao"] is not None and not estado["terminado"]:
+            st.caption(f"Preparando consultas em segundo plano: {estado['feitas']}/{estado['total']}")
+
+    # Intervalos completos e "Todas/Todos" não viram condição no SQL
+    st.session_state["filtros"] = Filtros(
+        anos=(ano_inicial, ano_final) if anos and (ano_inicial, ano_final) != (anos[0], anos[-1]) else None,
+        meses=(mes_inicial, mes_final) if (mes_inicial, mes_final) != (1, 12) else None,
+        empresas=tuple(empresas),
+        natureza=None if natureza == "Todas" else natureza,
+        grupo_voo=None if grupo_voo == "Todos" else grupo_voo,
+        origem_pais=None if origem_pais == "Todos" else origem_pais,
+        destino_pais=None if destino_pais == "Todos" else destino_pais,
+    )
+
 def main():
-    criarTable()
+    # Só a primeira carga bloqueia; as seguintes rodam em segundo plano
+    iniciar_carga()
+    # Em segundo plano: as páginas não esperam o aquecimento terminar
+    iniciar_aquecimento(opcoes_filtros)
     st.set_page_config(
         page_title="ANAC",
         page_icon="✈️",
@@ -30,8 +76,29 @@ def main():
             empresas,
             eficiencia
         ])
-    
+
+    filtros_globais()
+
+    # Modo de diagnóstico: ?diagnostico=1 na URL liga a chave por padrão
+    with st.sidebar:
+        st.toggle(
+            "Modo diagnóstico",
+            value=st.query_params.get("diagnostico") in ("1", "true", "sim"),
+            key="diagnostico",
+        )
+    if not diagnostico.ativo():
+        pg.run()
+        return
+
+    # O painel é reservado antes e preenchido depois da página (uma página
+    # que para cedo com st.stop() fica sem painel nesta execução)
+    painel = st.sidebar.container()
+    # Nome do arquivo da página, como as consultas são registradas (data/instrumentacao.py)
+    arquivos = [(dashboard_page, "dashboard"), (aeroportos, "aeroportos"), (empresas, "empresas"), (eficiencia, "eficiencia")]
+    diagnostico.iniciar_execucao(next(nome for pagina, nome in arquivos if pagina is pg))
     pg.run()
+    with painel:
+        diagnostico.painel()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file